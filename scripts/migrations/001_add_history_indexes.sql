@@ -0,0 +1,14 @@
+-- Covering indexes for the scheduler's hot-path lookups.
+-- Apply once per environment: mysql <db> < 001_add_history_indexes.sql
+--
+-- check_consecutive_hits/check_consecutive_failures run
+--   WHERE AssetId = ? AND KpiId = ? ORDER BY CreatedAt DESC LIMIT N
+-- for every KPI on every tick. Including Target makes the index covering,
+-- so the consecutive check is answered from the index without row fetches.
+CREATE INDEX idx_hist_asset_kpi_created
+    ON KPIsResultHistories (AssetId, KpiId, CreatedAt DESC, Target);
+
+-- create_incident / auto_close_incident look up open incidents with
+--   WHERE AssetId = ? AND KpiId = ? AND StatusId = 8
+CREATE INDEX idx_inc_asset_kpi_status
+    ON Incidents (AssetId, KpiId, StatusId);
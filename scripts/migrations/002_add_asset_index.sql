@@ -0,0 +1,9 @@
+-- Index for the scheduler's asset list query.
+-- Apply once per environment: mysql <db> < 002_add_asset_index.sql
+--
+-- load_assets filters WHERE DeletedAt IS NULL and joins CommonLookup on
+-- CitizenImpactLevelId. Leading on DeletedAt lets MySQL skip soft-deleted
+-- rows without a full table scan; including CitizenImpactLevelId feeds the
+-- join key straight from the index.
+CREATE INDEX idx_assets_live
+    ON Assets (DeletedAt, CitizenImpactLevelId);
@@ -10,11 +10,11 @@ Usage:
 
 import sys
 import os
+import time
 import logging
 import threading
 import requests as http_requests
 import urllib3
-from datetime import datetime
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -35,11 +35,22 @@ load_dotenv()
 
 MANUAL_LOG_PATH = os.getenv("MANUAL_LOG_PATH", "/var/logs/kpiMannual/")
 
+# log() needs today's date on every line for the rotation check; formatting
+# a fresh datetime per call is wasted work, so refresh at most once a second.
+_today_cache = [0, ""]  # [last_unix_second, date_string]
+
+def _today_str():
+    t = int(time.time())
+    if t != _today_cache[0]:
+        _today_cache[1] = time.strftime("%Y-%m-%d")
+        _today_cache[0] = t
+    return _today_cache[1]
+
 def setup_manual_logging():
     """Setup date-wise logging for the manual API server"""
     os.makedirs(MANUAL_LOG_PATH, exist_ok=True)
 
-    log_filename = datetime.now().strftime("%Y-%m-%d") + ".log"
+    log_filename = _today_str() + ".log"
     log_file = os.path.join(MANUAL_LOG_PATH, log_filename)
 
     logger = logging.getLogger("manual_kpi")
@@ -62,8 +73,7 @@ _logger = setup_manual_logging()
 def log(message, level="info"):
     """Log to manual API log files (date-wise rotation)"""
     # Check if date changed, rotate log file if needed
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    expected_log_file = os.path.join(MANUAL_LOG_PATH, f"{current_date}.log")
+    expected_log_file = os.path.join(MANUAL_LOG_PATH, f"{_today_str()}.log")
 
     for handler in _logger.handlers:
         if isinstance(handler, logging.FileHandler):
@@ -91,6 +101,8 @@ from src.scheduler.scheduler_v3 import (
     store_result,
     store_in_results_history,
     format_result_value,
+    publish_result_cache,
+    discard_result_cache,
 )
 from src.kpi_runners.browser_runner import SharedBrowserContext
 
@@ -295,6 +307,7 @@ def _run_manual_kpi_check(asset, kpi):
             result = run_kpi_for_asset(cursor, asset, kpi, incident_frequency)
 
         conn.commit()
+        publish_result_cache()
 
         # Recalculate metrics for this asset
         recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
@@ -313,8 +326,11 @@ def _run_manual_kpi_check(asset, kpi):
         try:
             if conn:
                 conn.commit()
+                publish_result_cache()
         except:
-            pass
+            # Never-committed entries must not be published by a later
+            # successful commit on this thread
+            discard_result_cache()
     finally:
         if cursor:
             cursor.close()
@@ -1,9 +1,57 @@
 from playwright.sync_api import sync_playwright, Page, Browser
 from src.kpi_runners.base import BaseKPIRunner
+from functools import lru_cache
+from urllib.parse import urljoin
 import time
-import re
 import requests
 
+# Link schemes that should never be HEAD-checked
+_SKIP_SCHEMES = ('mailto:', 'javascript:', 'tel:')
+
+
+def _full_url(base, href):
+    """Resolve an href against the page URL.
+
+    urljoin handles relative paths, '..', query strings and fragments that
+    naive string concatenation gets wrong."""
+    return href if href.startswith('http') else urljoin(base + '/', href)
+
+
+@lru_cache(maxsize=256)
+def _categorize(kpi_name):
+    """Map a KPI name to its dispatch category.
+
+    Memoized so the substring scans run once per distinct KPI name instead
+    of on every check. Order of the checks mirrors the original if/elif
+    chain (some names match more than one substring).
+    """
+    name = kpi_name.lower()
+    if 'partial outage' in name:
+        return 'partial_outage'
+    elif 'slow page load' in name:
+        return 'slow_load'
+    elif 'heavy pages' in name or 'excessive data' in name:
+        return 'heavy_pages'
+    elif 'security warning' in name:
+        return 'security_warning'
+    elif 'mixed content' in name:
+        return 'mixed_content'
+    elif 'suspicious redirects' in name or 'redirect' in name:
+        return 'redirects'
+    elif 'privacy policy' in name:
+        return 'privacy_policy'
+    elif 'assets' in name or 'broken css' in name:
+        return 'broken_assets'
+    elif 'search not available' in name or 'search' in name:
+        return 'search'
+    elif 'broken internal links' in name or 'broken links' in name:
+        return 'broken_links'
+    elif 'circular navigation' in name:
+        return 'circular_navigation'
+    elif 'download' in name:
+        return 'downloads'
+    return 'default'
+
 
 class BrowserKPIRunner(BaseKPIRunner):
     """
@@ -84,266 +132,307 @@ class BrowserKPIRunner(BaseKPIRunner):
             page.set_default_timeout(30000)
 
     def _run_kpi_check(self, page: Page, url: str, load_time: float):
-        """Internal method that runs the actual KPI check logic"""
-        kpi_name = self.kpi.get('kpi_name', '').lower()
-
+        """Dispatch to the handler for this KPI's category"""
         try:
-            # Partial outage - uses HTTP HEAD (fast) instead of browser navigation
-            if 'partial outage' in kpi_name:
-                inner_links = page.query_selector_all('a[href^="/"], a[href*="' + url + '"]')
-                total_links_found = len(inner_links)
-                failed_links = 0
-                checked_links = 0
-
-                for link in inner_links[:5]:
-                    try:
-                        href = link.get_attribute('href')
-                        if href and not href.startswith('#'):
-                            checked_links += 1
-                            full_url = href if href.startswith('http') else url.rstrip('/') + href
-                            resp = requests.head(full_url, timeout=3, verify=False, allow_redirects=True)
-                            if resp.status_code >= 400:
-                                failed_links += 1
-                    except:
-                        failed_links += 1
-
-                has_partial_outage = failed_links > 0
-                return {
-                    "flag": has_partial_outage,
-                    "value": f"{failed_links}/{checked_links}",
-                    "details": f"Found {total_links_found} internal links, scanned {checked_links}, {failed_links} failed" + (f" ({(failed_links/checked_links*100):.1f}% failure rate)" if checked_links > 0 else "")
-                }
-
-            # Slow page load
-            elif 'slow page load' in kpi_name:
-                slow_threshold = 5.0
-                return {
-                    "flag": load_time > slow_threshold,
-                    "value": round(load_time, 2),
-                    "details": f"Load time: {load_time:.2f}s ({'SLOW' if load_time > slow_threshold else 'OK'})"
-                }
-
-            # Heavy pages consuming excessive data
-            elif 'heavy pages' in kpi_name or 'excessive data' in kpi_name:
-                page_size_bytes = len(page.content())
-                page_size_mb = page_size_bytes / (1024 * 1024)
-                heavy_threshold = 5.0
-
-                return {
-                    "flag": page_size_mb > heavy_threshold,
-                    "value": round(page_size_mb, 2),
-                    "details": f"Page size: {page_size_mb:.2f} MB ({'HEAVY' if page_size_mb > heavy_threshold else 'OK'})"
-                }
-
-            # Browser security warning
-            elif 'security warning' in kpi_name:
-                security_warnings = []
-                page.on('console', lambda msg: security_warnings.append(msg.text) if 'security' in msg.text.lower() else None)
-
-                return {
-                    "flag": len(security_warnings) > 0,
-                    "value": len(security_warnings),
-                    "details": f"Security warnings: {len(security_warnings)}"
-                }
-
-            # Mixed content warnings
-            elif 'mixed content' in kpi_name:
-                if url.startswith('https://'):
-                    content = page.content()
-                    http_pattern = re.compile(r'http://[^\s"\'>]+')
-                    http_resources = http_pattern.findall(content)
-                    unique_http_resources = list(set(http_resources))
-
-                    resource_list = ', '.join(unique_http_resources[:5])
-                    if len(unique_http_resources) > 5:
-                        resource_list += f' ... and {len(unique_http_resources) - 5} more'
-
-                    return {
-                        "flag": len(unique_http_resources) > 0,
-                        "value": len(unique_http_resources),
-                        "details": f"HTTP resources on HTTPS page: {len(unique_http_resources)}" + (f" - [{resource_list}]" if unique_http_resources else "")
-                    }
-                else:
-                    return {
-                        "flag": False,
-                        "value": 0,
-                        "details": "Site uses HTTP (not applicable)"
-                    }
-
-            # Suspicious redirects
-            elif 'suspicious redirects' in kpi_name or 'redirect' in kpi_name:
-                final_url = page.url
-                was_redirected = final_url != url
-
-                return {
-                    "flag": was_redirected,
-                    "value": final_url if was_redirected else url,
-                    "details": f"Redirected to: {final_url}" if was_redirected else "No redirect"
-                }
-
-            # Privacy policy availability
-            elif 'privacy policy' in kpi_name:
-                privacy_links = page.query_selector_all('a[href*="privacy"], a:has-text("Privacy Policy")')
-                has_privacy_policy = len(privacy_links) > 0
-
-                return {
-                    "flag": not has_privacy_policy,
-                    "value": len(privacy_links),
-                    "details": f"Privacy policy link {'found' if has_privacy_policy else 'NOT FOUND'}"
-                }
-
-            # Page loads but assets don't (broken CSS/JS)
-            elif 'assets' in kpi_name or 'broken css' in kpi_name:
-                failed_resources = []
-                resource_types = {}
-
-                def track_failed(request):
-                    failed_resources.append(request.url)
-                    resource_type = request.resource_type
-                    resource_types[resource_type] = resource_types.get(resource_type, 0) + 1
-
-                page.on('requestfailed', track_failed)
-                page.reload()
-                time.sleep(1)
-
-                has_broken_assets = len(failed_resources) > 0
-                detail_msg = f"Failed resources: {len(failed_resources)}"
-                if resource_types:
-                    type_summary = ", ".join([f"{count} {rtype}" for rtype, count in list(resource_types.items())[:3]])
-                    detail_msg += f" - Types: [{type_summary}]"
-
-                return {
-                    "flag": has_broken_assets,
-                    "value": len(failed_resources),
-                    "details": detail_msg
-                }
+            handler = _DISPATCH[_categorize(self.kpi.get('kpi_name', ''))]
+            return handler(self, page, url, load_time)
+        except Exception as e:
+            return {
+                "flag": True,
+                "value": None,
+                "details": str(e)
+            }
 
-            # Search not available
-            elif 'search not available' in kpi_name or 'search' in kpi_name:
-                selectors = [
-                    'input[type="search"]',
-                    'input[name*="search" i]',
-                    'input[placeholder*="search" i]',
-                    'input[id*="search" i]',
-                    'input[class*="search" i]',
-                    '[role="search"]',
-                    'form[action*="search" i]',
-                    '.search-form',
-                    '.search-box',
-                    '.searchbox',
-                ]
-                combined = ', '.join(selectors)
-                search_elements = page.query_selector_all(combined)
-                has_search = len(search_elements) > 0
+    # Partial outage - uses HTTP HEAD (fast) instead of browser navigation
+    def _check_partial_outage(self, page, url, load_time):
+        inner_links = page.query_selector_all('a[href^="/"], a[href*="' + url + '"]')
+        total_links_found = len(inner_links)
+        base = url.rstrip('/')
+        failed_links = 0
+        checked_links = 0
 
-                return {
-                    "flag": not has_search,
-                    "value": len(search_elements),
-                    "details": f"Search functionality {'found' if has_search else 'NOT FOUND'} ({len(search_elements)} elements matched)"
-                }
+        for link in inner_links[:5]:
+            try:
+                href = link.get_attribute('href')
+                if href and not href.startswith('#') and not href.startswith(_SKIP_SCHEMES):
+                    checked_links += 1
+                    resp = requests.head(_full_url(base, href), timeout=3, verify=False, allow_redirects=True)
+                    if resp.status_code >= 400:
+                        failed_links += 1
+            except:
+                failed_links += 1
+
+        has_partial_outage = failed_links > 0
+        return {
+            "flag": has_partial_outage,
+            "value": f"{failed_links}/{checked_links}",
+            "details": f"Found {total_links_found} internal links, scanned {checked_links}, {failed_links} failed" + (f" ({(failed_links/checked_links*100):.1f}% failure rate)" if checked_links > 0 else "")
+        }
+
+    # Slow page load
+    def _check_slow_load(self, page, url, load_time):
+        slow_threshold = 5.0
+        return {
+            "flag": load_time > slow_threshold,
+            "value": round(load_time, 2),
+            "details": f"Load time: {load_time:.2f}s ({'SLOW' if load_time > slow_threshold else 'OK'})"
+        }
+
+    # Heavy pages consuming excessive data
+    # Size is measured in-browser so the full HTML never crosses CDP
+    def _check_heavy_pages(self, page, url, load_time):
+        page_size_bytes = page.evaluate("() => document.documentElement.outerHTML.length")
+        page_size_mb = page_size_bytes / (1024 * 1024)
+        heavy_threshold = 5.0
+
+        return {
+            "flag": page_size_mb > heavy_threshold,
+            "value": round(page_size_mb, 2),
+            "details": f"Page size: {page_size_mb:.2f} MB ({'HEAVY' if page_size_mb > heavy_threshold else 'OK'})"
+        }
+
+    # Browser security warning
+    def _check_security_warning(self, page, url, load_time):
+        security_warnings = []
+        page.on('console', lambda msg: security_warnings.append(msg.text) if 'security' in msg.text.lower() else None)
+
+        return {
+            "flag": len(security_warnings) > 0,
+            "value": len(security_warnings),
+            "details": f"Security warnings: {len(security_warnings)}"
+        }
+
+    # Mixed content warnings
+    def _check_mixed_content(self, page, url, load_time):
+        if url.startswith('https://'):
+            # Collect HTTP resource URLs in-browser - the src/href DOM
+            # properties are already absolute, so no regex over the HTML
+            unique_http_resources = page.evaluate(
+                "() => [...new Set([...document.querySelectorAll("
+                "'[src^=\"http://\"], [href^=\"http://\"]')]"
+                ".map(e => e.src || e.href))]"
+            )
 
-            # Broken internal links - uses HTTP HEAD (fast) instead of browser navigation
-            elif 'broken internal links' in kpi_name or 'broken links' in kpi_name:
-                all_links = page.query_selector_all('a[href]')
-                internal_links = []
+            resource_list = ', '.join(unique_http_resources[:5])
+            if len(unique_http_resources) > 5:
+                resource_list += f' ... and {len(unique_http_resources) - 5} more'
 
-                for link in all_links:
-                    href = link.get_attribute('href')
-                    if href and (href.startswith('/') or url in href) and not href.startswith('#'):
-                        internal_links.append(href)
+            return {
+                "flag": len(unique_http_resources) > 0,
+                "value": len(unique_http_resources),
+                "details": f"HTTP resources on HTTPS page: {len(unique_http_resources)}" + (f" - [{resource_list}]" if unique_http_resources else "")
+            }
+        else:
+            return {
+                "flag": False,
+                "value": 0,
+                "details": "Site uses HTTP (not applicable)"
+            }
 
-                total_internal_links = len(internal_links)
-                broken_count = 0
-                checked_count = min(len(internal_links), 5)
+    # Suspicious redirects
+    def _check_redirects(self, page, url, load_time):
+        final_url = page.url
+        was_redirected = final_url != url
+
+        return {
+            "flag": was_redirected,
+            "value": final_url if was_redirected else url,
+            "details": f"Redirected to: {final_url}" if was_redirected else "No redirect"
+        }
+
+    # Privacy policy availability
+    def _check_privacy_policy(self, page, url, load_time):
+        privacy_links = page.query_selector_all('a[href*="privacy"], a:has-text("Privacy Policy")')
+        has_privacy_policy = len(privacy_links) > 0
+
+        return {
+            "flag": not has_privacy_policy,
+            "value": len(privacy_links),
+            "details": f"Privacy policy link {'found' if has_privacy_policy else 'NOT FOUND'}"
+        }
+
+    # Page loads but assets don't (broken CSS/JS)
+    def _check_broken_assets(self, page, url, load_time):
+        failed_resources = []
+        resource_types = {}
+
+        def track_failed(request):
+            failed_resources.append(request.url)
+            resource_type = request.resource_type
+            resource_types[resource_type] = resource_types.get(resource_type, 0) + 1
+
+        page.on('requestfailed', track_failed)
+        page.reload()
+        time.sleep(1)
+
+        has_broken_assets = len(failed_resources) > 0
+        detail_msg = f"Failed resources: {len(failed_resources)}"
+        if resource_types:
+            type_summary = ", ".join([f"{count} {rtype}" for rtype, count in list(resource_types.items())[:3]])
+            detail_msg += f" - Types: [{type_summary}]"
+
+        return {
+            "flag": has_broken_assets,
+            "value": len(failed_resources),
+            "details": detail_msg
+        }
+
+    # Search not available
+    def _check_search(self, page, url, load_time):
+        selectors = [
+            'input[type="search"]',
+            'input[name*="search" i]',
+            'input[placeholder*="search" i]',
+            'input[id*="search" i]',
+            'input[class*="search" i]',
+            '[role="search"]',
+            'form[action*="search" i]',
+            '.search-form',
+            '.search-box',
+            '.searchbox',
+        ]
+        combined = ', '.join(selectors)
+        search_elements = page.query_selector_all(combined)
+        has_search = len(search_elements) > 0
+
+        return {
+            "flag": not has_search,
+            "value": len(search_elements),
+            "details": f"Search functionality {'found' if has_search else 'NOT FOUND'} ({len(search_elements)} elements matched)"
+        }
+
+    # Broken internal links - uses HTTP HEAD (fast) instead of browser navigation
+    def _check_broken_links(self, page, url, load_time):
+        # One evaluate fetches and filters every href - avoids a CDP
+        # round-trip per <a> element for link-heavy pages
+        internal_links = page.evaluate(
+            "(u) => [...document.querySelectorAll('a[href]')]"
+            ".map(a => a.getAttribute('href'))"
+            ".filter(h => h && !h.startsWith('#') && (h.startsWith('/') || h.includes(u)))",
+            url
+        )
 
-                for link_url in internal_links[:5]:
-                    try:
-                        full_url = link_url if link_url.startswith('http') else url.rstrip('/') + link_url
-                        resp = requests.head(full_url, timeout=3, verify=False, allow_redirects=True)
-                        if resp.status_code >= 400:
-                            broken_count += 1
-                    except:
-                        broken_count += 1
+        total_internal_links = len(internal_links)
+        base = url.rstrip('/')
+        internal_links = [h for h in internal_links if not h.startswith(_SKIP_SCHEMES)]
+        broken_count = 0
+        checked_count = min(len(internal_links), 5)
 
-                broken_percentage = (broken_count / checked_count * 100) if checked_count > 0 else 0
+        for link_url in internal_links[:5]:
+            try:
+                resp = requests.head(_full_url(base, link_url), timeout=3, verify=False, allow_redirects=True)
+                if resp.status_code >= 400:
+                    broken_count += 1
+            except:
+                broken_count += 1
+
+        broken_percentage = (broken_count / checked_count * 100) if checked_count > 0 else 0
+
+        return {
+            "flag": broken_count > 0,
+            "value": round(broken_percentage, 2),
+            "details": f"Found {total_internal_links} internal links, checked {checked_count}, {broken_count} broken ({broken_percentage:.1f}%)"
+        }
+
+    # Circular navigation - resolves hrefs in-page, follows redirects via HEAD
+    # (no real navigation, so no subpage loads or go_back() round-trips)
+    def _check_circular_navigation(self, page, url, load_time):
+        total_links = page.evaluate("() => document.querySelectorAll('a[href]').length")
+        hrefs = page.evaluate(
+            "() => [...document.querySelectorAll('a[href]')].slice(0, 3)"
+            ".map(a => new URL(a.getAttribute('href'), document.baseURI).toString())"
+        )
 
-                return {
-                    "flag": broken_count > 0,
-                    "value": round(broken_percentage, 2),
-                    "details": f"Found {total_internal_links} internal links, checked {checked_count}, {broken_count} broken ({broken_percentage:.1f}%)"
-                }
+        normalized_url = url.rstrip('/')
+        links_tested = 0
+        has_circular_nav = False
 
-            # Circular navigation - reduced scope, faster timeouts
-            elif 'circular navigation' in kpi_name:
-                navigation_chain = [url]
-                all_links = page.query_selector_all('a[href]')
-                links = all_links[:3]
-                links_tested = 0
-
-                has_circular_nav = False
-                for link in links:
-                    try:
-                        links_tested += 1
-                        link.click(timeout=2000)
-                        page.wait_for_load_state('load', timeout=3000)
-                        current_url = page.url
-
-                        if current_url in navigation_chain:
-                            has_circular_nav = True
-                            break
-
-                        navigation_chain.append(current_url)
-                        page.go_back()
-                    except:
-                        pass
+        for href in hrefs:
+            links_tested += 1
 
-                return {
-                    "flag": has_circular_nav,
-                    "value": len(navigation_chain),
-                    "details": f"Tested {links_tested} links from {len(all_links)} total, chain depth: {len(navigation_chain)}, circular: {'YES' if has_circular_nav else 'NO'}"
-                }
+            # Link pointing straight back at the current page
+            if href.rstrip('/') == normalized_url:
+                has_circular_nav = True
+                break
 
-            # Download success rate & broken download links
-            elif 'download' in kpi_name:
-                download_links = page.query_selector_all('a[href$=".pdf"], a[href$=".doc"], a[href$=".docx"], a[href$=".xls"], a[href$=".xlsx"], a[download]')
-
-                total_found = len(download_links)
-                broken_downloads = 0
-                total_downloads = min(len(download_links), 5)
-
-                for link in download_links[:5]:
-                    try:
-                        href = link.get_attribute('href')
-                        if href:
-                            full_url = href if href.startswith('http') else url.rstrip('/') + href
-                            response = requests.head(full_url, timeout=3, verify=False)
-                            if response.status_code >= 400:
-                                broken_downloads += 1
-                    except:
+            # Follow up to 3 redirect hops looking for a loop back to url
+            current = href
+            try:
+                for _ in range(3):
+                    resp = requests.head(current, timeout=3, verify=False, allow_redirects=False)
+                    location = resp.headers.get('Location')
+                    if resp.status_code not in (301, 302, 303, 307, 308) or not location:
+                        break
+                    # A relative Location resolves against the URL that
+                    # issued the redirect, not the page being tested
+                    current = location if location.startswith('http') else urljoin(current, location)
+                    if current.rstrip('/') == normalized_url:
+                        has_circular_nav = True
+                        break
+            except:
+                pass
+
+            if has_circular_nav:
+                break
+
+        return {
+            "flag": has_circular_nav,
+            "value": links_tested,
+            "details": f"Tested {links_tested} links from {total_links} total, circular: {'YES' if has_circular_nav else 'NO'}"
+        }
+
+    # Download success rate & broken download links
+    def _check_downloads(self, page, url, load_time):
+        download_links = page.query_selector_all('a[href$=".pdf"], a[href$=".doc"], a[href$=".docx"], a[href$=".xls"], a[href$=".xlsx"], a[download]')
+
+        total_found = len(download_links)
+        base = url.rstrip('/')
+        broken_downloads = 0
+        total_downloads = min(len(download_links), 5)
+
+        for link in download_links[:5]:
+            try:
+                href = link.get_attribute('href')
+                if href and not href.startswith(_SKIP_SCHEMES):
+                    response = requests.head(_full_url(base, href), timeout=3, verify=False)
+                    if response.status_code >= 400:
                         broken_downloads += 1
-
-                has_broken_downloads = broken_downloads > 0
-
-                return {
-                    "flag": has_broken_downloads,
-                    "value": f"{broken_downloads}/{total_downloads}",
-                    "details": f"Found {total_found} download links, checked {total_downloads}, {broken_downloads} broken" + (f" ({(broken_downloads/total_downloads*100):.1f}%)" if total_downloads > 0 else "")
-                }
-
-            # Default browser check
-            else:
-                return {
-                    "flag": False,
-                    "value": round(load_time, 2),
-                    "details": "Page loaded successfully"
-                }
-
-        except Exception as e:
-            return {
-                "flag": True,
-                "value": None,
-                "details": str(e)
-            }
+            except:
+                broken_downloads += 1
+
+        has_broken_downloads = broken_downloads > 0
+
+        return {
+            "flag": has_broken_downloads,
+            "value": f"{broken_downloads}/{total_downloads}",
+            "details": f"Found {total_found} download links, checked {total_downloads}, {broken_downloads} broken" + (f" ({(broken_downloads/total_downloads*100):.1f}%)" if total_downloads > 0 else "")
+        }
+
+    # Default browser check
+    def _check_default(self, page, url, load_time):
+        return {
+            "flag": False,
+            "value": round(load_time, 2),
+            "details": "Page loaded successfully"
+        }
+
+
+# Category -> handler dispatch, resolved with one dict lookup per check
+_DISPATCH = {
+    'partial_outage': BrowserKPIRunner._check_partial_outage,
+    'slow_load': BrowserKPIRunner._check_slow_load,
+    'heavy_pages': BrowserKPIRunner._check_heavy_pages,
+    'security_warning': BrowserKPIRunner._check_security_warning,
+    'mixed_content': BrowserKPIRunner._check_mixed_content,
+    'redirects': BrowserKPIRunner._check_redirects,
+    'privacy_policy': BrowserKPIRunner._check_privacy_policy,
+    'broken_assets': BrowserKPIRunner._check_broken_assets,
+    'search': BrowserKPIRunner._check_search,
+    'broken_links': BrowserKPIRunner._check_broken_links,
+    'circular_navigation': BrowserKPIRunner._check_circular_navigation,
+    'downloads': BrowserKPIRunner._check_downloads,
+    'default': BrowserKPIRunner._check_default,
+}
 
 
 class SharedBrowserContext:
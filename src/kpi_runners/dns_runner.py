@@ -1,40 +1,105 @@
 import socket
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from src.kpi_runners.base import BaseKPIRunner
 from urllib.parse import urlparse
 
+# DNS cache - populated by prewarm_dns() before a scheduler tick dispatches
+# its DNS KPIs, so each runner reads a recent result instead of issuing its
+# own blocking getaddrinfo. Maps hostname -> (fetched_at, result_tuple)
+# where result_tuple is (ip_address, ip_addresses, resolution_time_ms)
+# on success or an exception instance on failure.
+#
+# Failures expire after a single tick: a transient gaierror must not be
+# replayed as a miss for 5 minutes (feeding consecutive-miss streaks), nor
+# a recovery reported late. Caching them at all only dedupes lookups for a
+# failing host within one tick.
+DNS_CACHE_TTL = 300  # seconds
+DNS_FAILURE_TTL = 60  # seconds
+_dns_cache = {}
+_dns_cache_lock = threading.Lock()
+
+
+def _entry_ttl(result):
+    return DNS_FAILURE_TTL if isinstance(result, Exception) else DNS_CACHE_TTL
+
+
+def _resolve(hostname):
+    """Resolve a hostname, timing the lookup, and store it in the cache"""
+    try:
+        start_time = time.time()
+        ip_address = socket.gethostbyname(hostname)
+        ip_addresses = socket.gethostbyname_ex(hostname)[2]
+        resolution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        result = (ip_address, ip_addresses, resolution_time)
+    except Exception as e:
+        result = e
+
+    with _dns_cache_lock:
+        _dns_cache[hostname] = (time.monotonic(), result)
+    return result
+
+
+def _cached_resolve(hostname):
+    """Return a cached resolution if fresh, otherwise resolve and cache"""
+    with _dns_cache_lock:
+        cached = _dns_cache.get(hostname)
+    if cached and time.monotonic() - cached[0] < _entry_ttl(cached[1]):
+        return cached[1]
+    return _resolve(hostname)
+
+
+def prewarm_dns(hostnames, max_workers=10):
+    """Resolve a batch of hostnames concurrently, filling the cache.
+
+    Called by the scheduler before dispatching DNS KPIs so the lookups
+    overlap instead of running one blocking getaddrinfo per asset.
+    """
+    now = time.monotonic()
+    with _dns_cache_lock:
+        stale = [h for h in set(hostnames)
+                 if h not in _dns_cache
+                 or now - _dns_cache[h][0] >= _entry_ttl(_dns_cache[h][1])]
+
+    if not stale:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as executor:
+        for hostname in stale:
+            executor.submit(_resolve, hostname)
+
+
 class DNSKPIRunner(BaseKPIRunner):
 
     def run(self):
         url = self.asset['url']
         hostname = urlparse(url).netloc or url.replace('https://', '').replace('http://', '').split('/')[0]
 
-        try:
-            start_time = time.time()
-            ip_address = socket.gethostbyname(hostname)
-            ip_addresses = socket.gethostbyname_ex(hostname)[2]
-            resolution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-
-            detail_msg = f"Hostname: {hostname}, Primary IP: {ip_address}"
-            if len(ip_addresses) > 1:
-                detail_msg += f", Total IPs: {len(ip_addresses)} ({', '.join(ip_addresses)})"
-            detail_msg += f", Resolution time: {resolution_time:.0f}ms"
+        result = _cached_resolve(hostname)
 
-            return {
-                "flag": False,  # No problem - DNS resolved successfully
-                "value": ip_address,
-                "details": detail_msg
-            }
-
-        except socket.gaierror as e:
+        if isinstance(result, socket.gaierror):
             return {
                 "flag": True,  # Problem - DNS resolution failed
                 "value": None,
-                "details": f"DNS resolution failed: {str(e)}"
+                "details": f"DNS resolution failed: {str(result)}"
             }
-        except Exception as e:
+        if isinstance(result, Exception):
             return {
                 "flag": True,  # Problem - unexpected error
                 "value": None,
-                "details": f"Error: {str(e)}"
-            }
\ No newline at end of file
+                "details": f"Error: {str(result)}"
+            }
+
+        ip_address, ip_addresses, resolution_time = result
+
+        detail_msg = f"Hostname: {hostname}, Primary IP: {ip_address}"
+        if len(ip_addresses) > 1:
+            detail_msg += f", Total IPs: {len(ip_addresses)} ({', '.join(ip_addresses)})"
+        detail_msg += f", Resolution time: {resolution_time:.0f}ms"
+
+        return {
+            "flag": False,  # No problem - DNS resolved successfully
+            "value": ip_address,
+            "details": detail_msg
+        }
@@ -1,5 +1,6 @@
 import requests
 import ssl
+import threading
 from src.kpi_runners.base import BaseKPIRunner
 from src.config.settings import DEFAULT_TIMEOUT, FLAPPING_TIMEOUT, RETRY_DELAY
 from urllib3.util.ssl_ import create_urllib3_context
@@ -8,29 +9,49 @@ import urllib3
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Built once at import - create_default_context() reads and parses the CA
+# bundle, which is wasted work when repeated per pool init. SSLContext is
+# safe to share across connections/threads.
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.check_hostname = False
+_SSL_CTX.verify_mode = ssl.CERT_NONE
+
+
 class GovernmentSSLAdapter(HTTPAdapter):
     def init_poolmanager(self, *args, **kwargs):
-        context = ssl.create_default_context()
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_NONE
-        kwargs['ssl_context'] = context
+        kwargs['ssl_context'] = _SSL_CTX
         kwargs['assert_hostname'] = False
         return super().init_poolmanager(*args, **kwargs)
 
 
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+}
+
+# One session per worker thread instead of one per KPI run: the adapter and
+# its connection pool are built once, and keep-alive reuses TCP+TLS sessions
+# across the several HTTP KPIs that hit the same host each tick. Sessions
+# are thread-local because requests.Session is not thread-safe.
+_session_local = threading.local()
+
+
+def _get_session():
+    session = getattr(_session_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(_HEADERS)
+        session.mount('https://', GovernmentSSLAdapter())
+        _session_local.session = session
+    return session
+
+
 class HttpKPIRunner(BaseKPIRunner):
 
     def run(self):
         url = self.asset['url']
         kpi_name = self.kpi.get('kpi_name', '').lower()
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
-        }
-
-        session = requests.Session()
-        session.headers.update(headers)
-        session.mount('https://', GovernmentSSLAdapter())
+        session = _get_session()
 
         # Website completely down — try HEAD first, fallback to GET if HEAD fails
         if 'completely down' in kpi_name:
@@ -1,17 +1,39 @@
 import ssl
 import socket
+import time
+import threading
 from datetime import datetime, timezone
 from src.kpi_runners.base import BaseKPIRunner
 from urllib.parse import urlparse
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 
+# Certificate cache - certs rarely change within a day, so one TLS handshake
+# per hostname per TTL window is enough for the 1-min/5-min KPI cadence.
+# Maps hostname -> (fetched_at, expiry, cert_cn, issuer_cn)
+CERT_CACHE_TTL = 3600  # seconds
+_cert_cache = {}
+_cert_cache_lock = threading.Lock()
+
+
+def _cn(name):
+    """Extract the Common Name from an x509.Name in a single RDN pass"""
+    return next((attr.value for attr in name if attr.oid == x509.oid.NameOID.COMMON_NAME), "Unknown")
+
 class SSLKPIRunner(BaseKPIRunner):
 
     def run(self):
         url = self.asset['url']
         hostname = urlparse(url).netloc or url.replace('https://', '').replace('http://', '').split('/')[0]
 
+        # Serve from cache if we already inspected this host recently.
+        # days_until_expiry is computed at read time, so it stays accurate.
+        with _cert_cache_lock:
+            cached = _cert_cache.get(hostname)
+        if cached and time.monotonic() - cached[0] < CERT_CACHE_TTL:
+            _, expiry, cert_cn, issuer_cn = cached
+            return self._build_result(expiry, cert_cn, issuer_cn)
+
         # Create context that doesn't validate certificates
         # This allows us to inspect certificates even if they're from pakistan.gov.pk (local issuer)
         context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
@@ -37,34 +59,14 @@ class SSLKPIRunner(BaseKPIRunner):
                     # Extract certificate information
                     expiry = cert.not_valid_after_utc
 
-                    # Get certificate CN (Common Name)
-                    cert_cn = "Unknown"
-                    try:
-                        cn_attributes = cert.subject.get_attributes_for_oid(x509.oid.NameOID.COMMON_NAME)
-                        if cn_attributes:
-                            cert_cn = cn_attributes[0].value
-                    except Exception:
-                        pass
-
-                    # Get issuer CN
-                    issuer_cn = "Unknown"
-                    try:
-                        issuer_attributes = cert.issuer.get_attributes_for_oid(x509.oid.NameOID.COMMON_NAME)
-                        if issuer_attributes:
-                            issuer_cn = issuer_attributes[0].value
-                    except Exception:
-                        pass
-
-                    # Calculate days until expiry
-                    days_until_expiry = (expiry - datetime.now(timezone.utc)).days
-                    is_expired = days_until_expiry < 0
-                    expiring_soon = 0 < days_until_expiry <= 30  # Warning if expires within 30 days
-
-                    return {
-                        "flag": is_expired,  # True if certificate is expired
-                        "value": expiry.strftime('%Y-%m-%d'),
-                        "details": f"CN: {cert_cn}, Issuer: {issuer_cn}, Expires in {days_until_expiry} days ({'EXPIRED' if is_expired else 'WARNING' if expiring_soon else 'OK'})"
-                    }
+                    # Get certificate and issuer CN (Common Name)
+                    cert_cn = _cn(cert.subject)
+                    issuer_cn = _cn(cert.issuer)
+
+                    with _cert_cache_lock:
+                        _cert_cache[hostname] = (time.monotonic(), expiry, cert_cn, issuer_cn)
+
+                    return self._build_result(expiry, cert_cn, issuer_cn)
 
         except Exception as e:
             return {
@@ -72,3 +74,16 @@ class SSLKPIRunner(BaseKPIRunner):
                 "value": None,
                 "details": f"SSL connection failed: {str(e)}"
             }
+
+    def _build_result(self, expiry, cert_cn, issuer_cn):
+        """Build the KPI result dict from certificate attributes"""
+        # Calculate days until expiry
+        days_until_expiry = (expiry - datetime.now(timezone.utc)).days
+        is_expired = days_until_expiry < 0
+        expiring_soon = 0 < days_until_expiry <= 30  # Warning if expires within 30 days
+
+        return {
+            "flag": is_expired,  # True if certificate is expired
+            "value": expiry.strftime('%Y-%m-%d'),
+            "details": f"CN: {cert_cn}, Issuer: {issuer_cn}, Expires in {days_until_expiry} days ({'EXPIRED' if is_expired else 'WARNING' if expiring_soon else 'OK'})"
+        }
@@ -18,7 +18,11 @@ Usage:
 import sys
 import os
 import re
+import time
 import logging
+import logging.handlers
+import queue
+import atexit
 import signal
 import subprocess
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -31,13 +35,15 @@ sys.path.insert(0, project_root)
 from src.kpi_runners.http_runner import HttpKPIRunner
 from src.kpi_runners.browser_runner import BrowserKPIRunner, SharedBrowserContext
 from src.kpi_runners.ssl_runner import SSLKPIRunner
-from src.kpi_runners.dns_runner import DNSKPIRunner
+from src.kpi_runners.dns_runner import DNSKPIRunner, prewarm_dns
 from src.kpi_runners.accessiblity_runner import AccessibilityKPIRunner
 import mysql.connector
 import certifi
 import requests
 from datetime import datetime
+from urllib.parse import urlparse
 from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor as APSThreadPoolExecutor
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from dotenv import load_dotenv
@@ -67,6 +73,11 @@ DAILY_RUN_MINUTE = int(os.getenv("DAILY_RUN_MINUTE", "0"))  # Default: Start of
 # Parallel processing for daily KPIs - configurable via .env
 PARALLEL_WORKERS = int(os.getenv("PARALLEL_WORKERS", "5"))  # Default: 5 parallel browsers
 
+# Set on SIGTERM/SIGINT so in-flight jobs stop picking up new assets -
+# shutdown then only waits for the checks already running instead of
+# draining the rest of the tick
+SHUTDOWN = threading.Event()
+
 # Backend API (for control panel notifications)
 BACKEND_URL = os.getenv("BACKEND_URL", "https://localhost:7008")
 BACKEND_USERNAME = os.getenv("BACKEND_USERNAME", "")
@@ -77,24 +88,45 @@ BACKEND_PASSWORD = os.getenv("BACKEND_PASSWORD", "")
 # ============================================================
 
 def setup_logging():
-    """Setup date-wise logging to file"""
+    """Setup date-wise logging to file.
+
+    Rotation is delegated to TimedRotatingFileHandler so log() doesn't have
+    to scan handlers and compare file names on every call - the stdlib
+    rolls the file over at midnight (keeping the date-suffixed naming).
+
+    The file and console handlers live behind a QueueListener on a
+    background thread, so worker threads only enqueue records instead of
+    blocking on disk/stdout writes (and don't contend on handler locks).
+
+    The QueueHandler hangs off the root logger (as basicConfig did) so
+    third-party records - notably APScheduler's misfire warnings,
+    max_instances skips and job crash tracebacks - land in the same
+    rotated file instead of falling to bare stderr."""
     # Create log directory if it doesn't exist
     os.makedirs(AUTO_LOG_PATH, exist_ok=True)
 
-    # Date-wise log file name
-    log_filename = datetime.now().strftime("%Y-%m-%d") + ".log"
-    log_file = os.path.join(AUTO_LOG_PATH, log_filename)
-
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s [%(levelname)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S',
-        handlers=[
-            logging.FileHandler(log_file, mode='a', encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
+    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s', '%Y-%m-%d %H:%M:%S')
+
+    file_handler = logging.handlers.TimedRotatingFileHandler(
+        os.path.join(AUTO_LOG_PATH, "kpi.log"),
+        when="midnight", backupCount=30, encoding="utf-8"
+    )
+    file_handler.suffix = "%Y-%m-%d"
+    file_handler.setFormatter(formatter)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
     )
+    listener.start()
+    atexit.register(listener.stop)  # drain the queue on shutdown
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logging.getLogger(__name__)
 
@@ -110,22 +142,6 @@ def log(message, level="info"):
         _thread_local.log_buffer.append((message, level))
         return
 
-    # Check if date changed, rotate log file if needed
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    expected_log_file = os.path.join(AUTO_LOG_PATH, f"{current_date}.log")
-
-    # Check if we need to rotate to a new date file
-    for handler in logger.handlers:
-        if isinstance(handler, logging.FileHandler):
-            if handler.baseFilename != expected_log_file:
-                # Date changed, update file handler
-                handler.close()
-                logger.removeHandler(handler)
-                new_handler = logging.FileHandler(expected_log_file, mode='a', encoding='utf-8')
-                new_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s', '%Y-%m-%d %H:%M:%S'))
-                logger.addHandler(new_handler)
-            break
-
     if level == "error":
         logger.error(message)
     elif level == "warning":
@@ -227,9 +243,29 @@ def notify_incidents(incident_ids):
         log(f"[NOTIFY] Incident notification failed: {str(e)}", "error")
 
 
+# One persistent worker pool shared by every frequency job. The worker
+# threads (and with them the thread-local pooled connection and prepared
+# cursor each one holds) survive across ticks; a per-tick executor would
+# let its threads die still holding PooledMySQLConnections, and pool slots
+# are only reclaimed via close() - there is no finalizer - so each tick
+# would permanently drain up to PARALLEL_WORKERS slots. Created lazily so
+# importing this module doesn't spawn threads.
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+def _get_worker_pool():
+    global _worker_pool
+    if _worker_pool is None:
+        with _worker_pool_lock:
+            if _worker_pool is None:
+                _worker_pool = ThreadPoolExecutor(max_workers=PARALLEL_WORKERS,
+                                                  thread_name_prefix="kpi-worker")
+    return _worker_pool
+
+
 def run_parallel_and_log_in_order(assets, worker_fn, worker_args):
-    """Run a worker function across all assets in parallel using ThreadPoolExecutor,
-    but flush logs progressively in asset order as workers complete.
+    """Run a worker function across all assets in parallel using the shared
+    worker pool, but flush logs progressively in asset order as workers complete.
 
     Args:
         assets: list of asset dicts (defines the output order)
@@ -244,35 +280,35 @@ def run_parallel_and_log_in_order(assets, worker_fn, worker_args):
     next_index = 0  # next asset index to flush
     asset_id_to_index = {asset['Id']: idx for idx, asset in enumerate(assets)}
 
-    with ThreadPoolExecutor(max_workers=PARALLEL_WORKERS) as executor:
-        futures = {
-            executor.submit(worker_fn, asset, *worker_args): asset
-            for asset in assets
-        }
+    executor = _get_worker_pool()
+    futures = {
+        executor.submit(worker_fn, asset, *worker_args): asset
+        for asset in assets
+    }
 
-        for future in as_completed(futures):
-            asset = futures[future]
-            try:
-                counts = future.result()
-                results_by_asset[asset['Id']] = counts
-            except Exception as e:
-                results_by_asset[asset['Id']] = {
-                    'checks': 0, 'hits': 0, 'misses': 0, 'skipped': 0,
-                    'log_buffer': [(f"[ERROR] Failed processing {asset['AssetName']}: {str(e)}", "error")]
-                }
-
-            # Flush all consecutive completed assets starting from next_index
-            while next_index < len(assets):
-                asset_at_index = assets[next_index]
-                if asset_at_index['Id'] not in results_by_asset:
-                    break  # this asset hasn't finished yet
-                counts = results_by_asset[asset_at_index['Id']]
-                flush_log_buffer(counts.get('log_buffer', []))
-                totals['checks'] += counts.get('checks', 0)
-                totals['hits'] += counts.get('hits', 0)
-                totals['misses'] += counts.get('misses', 0)
-                totals['skipped'] += counts.get('skipped', 0)
-                next_index += 1
+    for future in as_completed(futures):
+        asset = futures[future]
+        try:
+            counts = future.result()
+            results_by_asset[asset['Id']] = counts
+        except Exception as e:
+            results_by_asset[asset['Id']] = {
+                'checks': 0, 'hits': 0, 'misses': 0, 'skipped': 0,
+                'log_buffer': [(f"[ERROR] Failed processing {asset['AssetName']}: {str(e)}", "error")]
+            }
+
+        # Flush all consecutive completed assets starting from next_index
+        while next_index < len(assets):
+            asset_at_index = assets[next_index]
+            if asset_at_index['Id'] not in results_by_asset:
+                break  # this asset hasn't finished yet
+            counts = results_by_asset[asset_at_index['Id']]
+            flush_log_buffer(counts.get('log_buffer', []))
+            totals['checks'] += counts.get('checks', 0)
+            totals['hits'] += counts.get('hits', 0)
+            totals['misses'] += counts.get('misses', 0)
+            totals['skipped'] += counts.get('skipped', 0)
+            next_index += 1
 
     # Flush any remaining (shouldn't happen, but safety net)
     while next_index < len(assets):
@@ -292,20 +328,63 @@ def run_parallel_and_log_in_order(assets, worker_fn, worker_args):
 # HELPER FUNCTIONS
 # ============================================================
 
+# Connection pool - one TCP+auth handshake per pooled slot instead of per
+# job. Created lazily so importing this module (e.g. from the API server)
+# doesn't open connections. Sized for the shared worker pool plus one
+# connection per concurrently running frequency job, with headroom for the
+# legacy/manual paths.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(PARALLEL_WORKERS + 8)))
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name="kpi",
+                    pool_size=POOL_SIZE,
+                    pool_reset_session=False,
+                    **DB_CONFIG
+                )
+    return _pool
+
 def get_db_connection():
-    """Get a new database connection"""
-    return mysql.connector.connect(**DB_CONFIG)
+    """Get a database connection from the shared pool.
+
+    conn.close() on a pooled connection returns it to the pool, so existing
+    call sites keep working unchanged. Falls back to a direct connection if
+    the pool is exhausted rather than failing the job."""
+    try:
+        return _get_pool().get_connection()
+    except mysql.connector.errors.PoolError:
+        log("[WARN] Connection pool exhausted, opening direct connection", "warning")
+        return mysql.connector.connect(**DB_CONFIG)
+
+def prewarm_dns_for_tick(assets, kpis):
+    """Batch-resolve all asset hostnames before dispatching DNS KPIs.
+
+    Runs the lookups concurrently so the DNS phase of a tick is bounded by
+    the slowest host instead of the sum of all resolutions."""
+    if not any(k['KpiType'] == 'dns' for k in kpis):
+        return
+    hostnames = [h for h in (urlparse(a['AssetUrl']).netloc for a in assets) if h]
+    if hostnames:
+        prewarm_dns(hostnames)
+
+# Built once - get_runner is called for every (asset, KPI) pair
+_RUNNER_REGISTRY = {
+    'http': HttpKPIRunner,
+    'dns': DNSKPIRunner,
+    'browser': BrowserKPIRunner,
+    'ssl': SSLKPIRunner,
+    'accessibility': AccessibilityKPIRunner
+}
 
 def get_runner(kpi_type, asset, kpi):
     """Get the appropriate KPI runner based on type"""
-    runners = {
-        'http': HttpKPIRunner,
-        'dns': DNSKPIRunner,
-        'browser': BrowserKPIRunner,
-        'ssl': SSLKPIRunner,
-        'accessibility': AccessibilityKPIRunner
-    }
-    runner_class = runners.get(kpi_type)
+    runner_class = _RUNNER_REGISTRY.get(kpi_type)
     if runner_class:
         return runner_class(asset, kpi)
     return None
@@ -329,49 +408,99 @@ def format_flag_value(result, outcome_type):
     else:
         return str(value) if value is not None else ''
 
+# Dispatch table for format_result_value - one dict lookup instead of
+# walking an elif chain on every store
+_RESULT_FORMATS = {
+    'Flag': lambda result: 'true' if result.get('flag') else 'false',
+    'Sec': lambda result: str(result['value']) if result.get('value') is not None else '0',
+    'MB': lambda result: str(result['value']) if result.get('value') is not None else '0',
+    '%': lambda result: f"{result['value']}%" if result.get('value') is not None else '0%',
+}
+
+def _format_result_default(result):
+    return str(result['value']) if result.get('value') is not None else ''
+
 def format_result_value(result, outcome_type):
     """Format the Result column value based on outcome type"""
-    value = result.get('value')
+    return _RESULT_FORMATS.get(outcome_type, _format_result_default)(result)
 
-    if outcome_type == 'Flag':
-        return 'true' if result.get('flag') else 'false'
-    elif outcome_type == 'Sec':
-        return str(value) if value is not None else '0'
-    elif outcome_type == 'MB':
-        return str(value) if value is not None else '0'
-    elif outcome_type == '%':
-        return f"{value}%" if value is not None else '0%'
-    else:
-        return str(value) if value is not None else ''
+# Strips units (e.g. "%", "s", "MB") before numeric comparison
+_TARGET_CLEAN_RE = re.compile(r'[^0-9.\-]')
 
 def determine_target_hit_miss(result_value, target_value, outcome_type, runner_flag):
     """Determine if result is a hit or miss based on target comparison."""
-    if outcome_type == 'Flag':
-        return "miss" if runner_flag else "hit"
-
-    if not target_value or target_value == '':
+    # Only Sec/MB/% are compared numerically - every other outcome type is
+    # decided by the runner flag, so bail out before any parsing work
+    if outcome_type not in ('Sec', 'MB', '%') or not target_value:
         return "miss" if runner_flag else "hit"
 
     try:
-        # Strip non-numeric characters (e.g., "%", "s", "MB") before comparison
-        clean_result = re.sub(r'[^0-9.\-]', '', str(result_value)) if result_value else '0'
-        clean_target = re.sub(r'[^0-9.\-]', '', str(target_value)) if target_value else '0'
+        clean_result = _TARGET_CLEAN_RE.sub('', str(result_value)) if result_value else '0'
+        clean_target = _TARGET_CLEAN_RE.sub('', str(target_value)) if target_value else '0'
 
         result_num = float(clean_result) if clean_result else 0
         target_num = float(clean_target) if clean_target else 0
 
-        if outcome_type in ['Sec', 'MB']:
-            return "hit" if result_num <= target_num else "miss"
-        elif outcome_type == '%':
+        if outcome_type == '%':
             return "hit" if result_num >= target_num else "miss"
-        else:
-            return "miss" if runner_flag else "hit"
+        return "hit" if result_num <= target_num else "miss"
 
     except (ValueError, TypeError):
         return "miss" if runner_flag else "hit"
 
-def check_consecutive_hits(cursor, asset_id, kpi_id, required_frequency):
+# Set once the first prefetch fails (e.g. pre-8.0 server without window
+# functions) so the fallback doesn't log per asset per tick.
+_recent_targets_warned = False
+
+def load_recent_targets(cursor, asset_id, limit):
+    """Fetch the last `limit` stored targets for every KPI of an asset in a
+    single query, newest first. Returns {kpi_id: [targets...]}.
+
+    The consecutive-hit/miss checks used to issue one LIMIT-N SELECT per
+    KPI; prefetching the window once per asset replaces all of them. The
+    CreatedAt bound keeps the derived table from materializing the asset's
+    entire (unbounded) history: 30 days still covers `limit` rows at the
+    slowest (Daily) cadence with a wide margin.
+
+    Requires MySQL 8.0 (window functions); returns None on failure so
+    callers fall back to per-KPI queries."""
+    global _recent_targets_warned
+    try:
+        cursor.execute("""
+            SELECT KpiId, Target
+            FROM (
+                SELECT KpiId, Target,
+                       ROW_NUMBER() OVER (PARTITION BY KpiId ORDER BY CreatedAt DESC) AS rn
+                FROM KPIsResultHistories
+                WHERE AssetId = %s
+                  AND CreatedAt >= NOW() - INTERVAL 30 DAY
+            ) recent
+            WHERE rn <= %s
+            ORDER BY KpiId, rn
+        """, (asset_id, limit))
+
+        targets = {}
+        for row in cursor.fetchall():
+            targets.setdefault(row['KpiId'], []).append(row['Target'])
+        return targets
+    except Exception as e:
+        if not _recent_targets_warned:
+            _recent_targets_warned = True
+            log(f"[WARN] Recent-target prefetch unavailable, using per-KPI queries: {str(e)}", "warning")
+        return None
+
+def _streak(recent_targets, kpi_id, required_frequency, wanted):
+    """Check a prefetched target window for `required_frequency` consecutive
+    `wanted` outcomes, mirroring the LIMIT-N query semantics."""
+    recent = recent_targets.get(kpi_id, [])[:required_frequency]
+    if len(recent) < required_frequency:
+        return False
+    return all(target == wanted for target in recent)
+
+def check_consecutive_hits(cursor, asset_id, kpi_id, required_frequency, recent_targets=None):
     """Check if KPI has passed consecutively for the required number of times"""
+    if recent_targets is not None:
+        return _streak(recent_targets, kpi_id, required_frequency, 'hit')
     try:
         cursor.execute("""
             SELECT Target
@@ -402,60 +531,87 @@ def auto_close_incident(cursor, asset_id, kpi_id):
         """, (asset_id, kpi_id))
 
         incidents = cursor.fetchall()
-        closed_count = 0
-        closed_ids = []
+        if not incidents:
+            return 0
 
-        for incident in incidents:
-            cursor.execute("""
-                UPDATE Incidents
-                SET StatusId = 12, UpdatedAt = NOW(), UpdatedBy = 'system'
-                WHERE Id = %s
-            """, (incident['Id'],))
+        closed_ids = [incident['Id'] for incident in incidents]
 
-            # Insert into IncidentHistories (audit trail)
-            cursor.execute("""
-                INSERT INTO IncidentHistories (AssetId, IncidentId, KpiId, IncidentTitle, Description,
-                                                Type, SeverityId, StatusId, AssignedTo, CreatedBy, CreatedAt)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, 12, %s, 'System Generated', NOW())
-            """, (incident['AssetId'], incident['Id'], incident['KpiId'], incident['IncidentTitle'],
-                  incident['Description'], incident['Type'], incident['SeverityId'], incident['AssignedTo']))
+        # Close all matching incidents in one statement, then batch the
+        # audit rows - 3 round-trips total instead of 3 per incident
+        placeholders = ', '.join(['%s'] * len(closed_ids))
+        cursor.execute(f"""
+            UPDATE Incidents
+            SET StatusId = 12, UpdatedAt = NOW(), UpdatedBy = 'system'
+            WHERE Id IN ({placeholders})
+        """, closed_ids)
 
-            # Insert into IncidentComments
-            cursor.execute("""
-                INSERT INTO IncidentComments (IncidentId, Comment, Status, CreatedBy, CreatedAt)
-                VALUES (%s, 'Auto Generated Incident', 'RESOLVED', 'pda', NOW())
-            """, (incident['Id'],))
+        # Insert into IncidentHistories (audit trail)
+        cursor.executemany("""
+            INSERT INTO IncidentHistories (AssetId, IncidentId, KpiId, IncidentTitle, Description,
+                                            Type, SeverityId, StatusId, AssignedTo, CreatedBy, CreatedAt)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 12, %s, 'System Generated', NOW())
+        """, [(incident['AssetId'], incident['Id'], incident['KpiId'], incident['IncidentTitle'],
+               incident['Description'], incident['Type'], incident['SeverityId'], incident['AssignedTo'])
+              for incident in incidents])
 
-            closed_count += 1
-            closed_ids.append(incident['Id'])
-            log(f"[AUTO-CLOSE] Incident #{incident['Id']} resolved")
+        # Insert into IncidentComments
+        cursor.executemany("""
+            INSERT INTO IncidentComments (IncidentId, Comment, Status, CreatedBy, CreatedAt)
+            VALUES (%s, 'Auto Generated Incident', 'RESOLVED', 'pda', NOW())
+        """, [(incident_id,) for incident_id in closed_ids])
+
+        for incident_id in closed_ids:
+            log(f"[AUTO-CLOSE] Incident #{incident_id} resolved")
 
-        if closed_ids:
-            notify_incidents(closed_ids)
+        notify_incidents(closed_ids)
 
-        return closed_count
+        return len(closed_ids)
     except Exception as e:
         log(f"[ERROR] Auto-closing incident: {str(e)}", "error")
         return 0
 
-def store_in_results_history(cursor, asset_id, kpis_result_id, kpi_id, target, result_value, details):
-    """Store KPI result in history table (KPIsResultHistories)"""
+HISTORY_INSERT_SQL = """
+    INSERT INTO KPIsResultHistories (AssetId, KPIsResultId, KpiId, Details, CreatedAt, Target, Result)
+    VALUES (%s, %s, %s, %s, NOW(), %s, %s)
+"""
+
+def store_in_results_history(cursor, asset_id, kpis_result_id, kpi_id, target, result_value, details, batch=None):
+    """Store KPI result in history table (KPIsResultHistories).
+
+    When a batch list is given, the row is queued instead of inserted;
+    the caller flushes it with flush_history_batch() before committing.
+    This collapses one INSERT round-trip per KPI into one per asset."""
     try:
         if not kpis_result_id:
             log(f"[WARN] No kpisResults ID, skipping history insert", "warning")
             return None
 
-        cursor.execute("""
-            INSERT INTO KPIsResultHistories (AssetId, KPIsResultId, KpiId, Details, CreatedAt, Target, Result)
-            VALUES (%s, %s, %s, %s, NOW(), %s, %s)
-        """, (asset_id, kpis_result_id, kpi_id, details, target, result_value))
+        row = (asset_id, kpis_result_id, kpi_id, details, target, result_value)
+        if batch is not None:
+            batch.append(row)
+            return None
+
+        cursor.execute(HISTORY_INSERT_SQL, row)
         return cursor.lastrowid
     except Exception as e:
         log(f"[ERROR] Storing in history: {str(e)}", "error")
         return None
 
-def check_consecutive_failures(cursor, asset_id, kpi_id, required_frequency):
+def flush_history_batch(cursor, batch):
+    """Flush queued history rows with a single executemany"""
+    if not batch:
+        return
+    try:
+        cursor.executemany(HISTORY_INSERT_SQL, batch)
+    except Exception as e:
+        log(f"[ERROR] Flushing history batch: {str(e)}", "error")
+    finally:
+        batch.clear()
+
+def check_consecutive_failures(cursor, asset_id, kpi_id, required_frequency, recent_targets=None):
     """Check if KPI has failed consecutively for the required number of times"""
+    if recent_targets is not None:
+        return _streak(recent_targets, kpi_id, required_frequency, 'miss')
     try:
         cursor.execute("""
             SELECT Target
@@ -475,19 +631,71 @@ def check_consecutive_failures(cursor, asset_id, kpi_id, required_frequency):
         log(f"[ERROR] Checking consecutive failures: {str(e)}", "error")
         return False
 
-def create_incident(cursor, asset_id, kpi_id, kpi_name, severity_id):
-    """Create an incident when a KPI check fails"""
+def check_miss_state(cursor, asset_id, kpi_id, required_frequency, recent_targets=None):
+    """Combined miss handling check in a single round-trip.
+
+    A miss used to cost two SELECTs: the consecutive-failure streak, then
+    create_incident's lookup for an already-open incident. This folds both
+    into one query. Returns (consecutive_failures, open_incident_id).
+
+    With a prefetched recent_targets window the streak is answered from
+    memory, and the incident lookup only runs once the streak is met."""
+    if recent_targets is not None:
+        if not _streak(recent_targets, kpi_id, required_frequency, 'miss'):
+            return False, None
+        try:
+            cursor.execute("""
+                SELECT Id FROM Incidents
+                WHERE AssetId = %s AND KpiId = %s AND StatusId = 8
+                LIMIT 1
+            """, (asset_id, kpi_id))
+            row = cursor.fetchone()
+            return True, row['Id'] if row else None
+        except Exception as e:
+            log(f"[ERROR] Checking miss state: {str(e)}", "error")
+            return False, None
     try:
         cursor.execute("""
-            SELECT Id FROM Incidents
-            WHERE AssetId = %s AND KpiId = %s AND StatusId = 8
-            LIMIT 1
-        """, (asset_id, kpi_id))
+            SELECT COUNT(*) AS total,
+                   COALESCE(SUM(Target = 'miss'), 0) AS misses,
+                   (SELECT Id FROM Incidents
+                    WHERE AssetId = %s AND KpiId = %s AND StatusId = 8
+                    LIMIT 1) AS open_incident_id
+            FROM (
+                SELECT Target
+                FROM KPIsResultHistories
+                WHERE AssetId = %s AND KpiId = %s
+                ORDER BY CreatedAt DESC
+                LIMIT %s
+            ) recent
+        """, (asset_id, kpi_id, asset_id, kpi_id, required_frequency))
+
+        row = cursor.fetchone()
+        total = int(row['total'])
+        consecutive = total >= required_frequency and int(row['misses']) == total
+        return consecutive, row['open_incident_id']
+    except Exception as e:
+        log(f"[ERROR] Checking miss state: {str(e)}", "error")
+        return False, None
+
+def create_incident(cursor, asset_id, kpi_id, kpi_name, severity_id, skip_open_check=False):
+    """Create an incident when a KPI check fails.
+
+    skip_open_check: pass True when the caller has already verified (in the
+    same transaction) that no auto incident is open for this pair - e.g. via
+    check_miss_state - so the guard SELECT here is a wasted round-trip."""
+    try:
+        if not skip_open_check:
+            cursor.execute("""
+                SELECT Id FROM Incidents
+                WHERE AssetId = %s AND KpiId = %s AND StatusId = 8
+                LIMIT 1
+            """, (asset_id, kpi_id))
 
-        existing_incident = cursor.fetchone()
+            existing_incident = cursor.fetchone()
 
-        if existing_incident:
-            return existing_incident['Id'], False
+            if existing_incident:
+                return existing_incident['Id'], False
 
         incident_title = f"{kpi_name} - Breach"
         description = f"{kpi_name} - Auto Created Incident"
@@ -519,10 +727,64 @@ def create_incident(cursor, asset_id, kpi_id, kpi_name, severity_id):
         log(f"[ERROR] Creating incident: {str(e)}", "error")
         return None, False
 
-def store_result(cursor, asset_id, kpi_id, result, outcome_type, target_value=None, target_override=None):
-    """Store KPI result in the database using UPSERT logic. Returns the kpisResults row ID."""
+# Last value written per (asset_id, kpi_id). On stable systems most ticks
+# repeat the previous result, so the full upsert (Result/Details row image,
+# index churn, binlog) can be replaced by a primary-key UpdatedAt heartbeat.
+#
+# Writes are staged per thread and only published here once the transaction
+# that carried them commits (publish_result_cache). Publishing at execute
+# time would let a rolled-back upsert suppress every later identical write,
+# leaving kpisResults stale forever with a fresh-looking UpdatedAt.
+_last_written = {}
+_last_written_lock = threading.Lock()
+
+
+def _stage_result(key, entry):
+    staged = getattr(_thread_local, 'staged_results', None)
+    if staged is None:
+        staged = _thread_local.staged_results = {}
+    staged[key] = entry
+
+
+def publish_result_cache():
+    """Publish writes staged by store_result. Call after a successful commit
+    of the transaction that executed them."""
+    staged = getattr(_thread_local, 'staged_results', None)
+    if staged:
+        with _last_written_lock:
+            _last_written.update(staged)
+        staged.clear()
+
+
+def discard_result_cache():
+    """Drop staged writes whose transaction was lost (dead connection)."""
+    staged = getattr(_thread_local, 'staged_results', None)
+    if staged:
+        staged.clear()
+
+RESULT_UPSERT_SQL = """
+    INSERT INTO kpisResults (AssetId, KpiId, Result, Details, CreatedAt, UpdatedAt, Target)
+    VALUES (%s, %s, %s, %s, NOW(), NOW(), %s)
+    ON DUPLICATE KEY UPDATE
+        Result = VALUES(Result),
+        Details = VALUES(Details),
+        UpdatedAt = NOW(),
+        Target = VALUES(Target),
+        Id = LAST_INSERT_ID(Id)
+"""
+
+def store_result(cursor, asset_id, kpi_id, result, outcome_type, target_value=None, target_override=None, write_cursor=None, result_value=None):
+    """Store KPI result in the database using UPSERT logic. Returns the kpisResults row ID.
+
+    write_cursor: optional prepared cursor dedicated to this UPSERT (see
+    get_thread_write_cursor) - the server then parses the statement once
+    per thread instead of on every call. Must share the caller's connection.
+
+    result_value: pass the already-formatted value when the caller needs it
+    too (for the history row), so it is only formatted once."""
     try:
-        result_value = format_result_value(result, outcome_type)
+        if result_value is None:
+            result_value = format_result_value(result, outcome_type)
         details = result.get('details', '')
 
         # Use target_override if provided (e.g., "skipped"), otherwise calculate
@@ -536,18 +798,22 @@ def store_result(cursor, asset_id, kpi_id, result, outcome_type, target_value=No
                 result.get('flag')
             )
 
-        cursor.execute("""
-            INSERT INTO kpisResults (AssetId, KpiId, Result, Details, CreatedAt, UpdatedAt, Target)
-            VALUES (%s, %s, %s, %s, NOW(), NOW(), %s)
-            ON DUPLICATE KEY UPDATE
-                Result = VALUES(Result),
-                Details = VALUES(Details),
-                UpdatedAt = NOW(),
-                Target = VALUES(Target),
-                Id = LAST_INSERT_ID(Id)
-        """, (asset_id, kpi_id, result_value, details, target))
+        key = (asset_id, kpi_id)
+        signature = (target, result_value, hash(details))
+        with _last_written_lock:
+            last = _last_written.get(key)
 
-        return cursor.lastrowid
+        if last is not None and last[0] == signature and last[1]:
+            # Unchanged since the previous tick - just bump the heartbeat
+            cursor.execute("UPDATE kpisResults SET UpdatedAt = NOW() WHERE Id = %s", (last[1],))
+            return last[1]
+
+        upsert_cursor = write_cursor if write_cursor is not None else cursor
+        upsert_cursor.execute(RESULT_UPSERT_SQL, (asset_id, kpi_id, result_value, details, target))
+
+        result_id = upsert_cursor.lastrowid
+        _stage_result(key, (signature, result_id))
+        return result_id
     except Exception as e:
         log(f"[ERROR] Storing result: {str(e)}", "error")
         return None
@@ -556,6 +822,139 @@ def store_result(cursor, asset_id, kpi_id, result, outcome_type, target_value=No
 # ASSET METRICS CALCULATION
 # ============================================================
 
+# MetricWeights and the SeverityLevel lookup are static configuration, but
+# recalculate_asset_metrics used to re-SELECT them for every asset (five
+# roundtrips per asset per cycle). Fetch each once per TTL window instead
+# and share the result across assets and threads.
+WEIGHTS_CACHE_TTL = 600  # seconds
+_config_cache = {}  # key -> (fetched_at, value)
+_config_cache_lock = threading.Lock()
+
+
+def _cached_config(key, ttl=WEIGHTS_CACHE_TTL):
+    with _config_cache_lock:
+        cached = _config_cache.get(key)
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    return None
+
+
+def _store_config(key, value):
+    with _config_cache_lock:
+        _config_cache[key] = (time.monotonic(), value)
+
+
+def load_metric_weights(cursor):
+    """Load all MetricWeights in one SELECT, partitioned by category.
+
+    Returns (chm_weights, ocm_weights, drei_weights, criticality_map).
+    """
+    cached = _cached_config('weights')
+    if cached is not None:
+        return cached
+
+    chm_weights, ocm_weights, drei_weights, criticality_map = {}, {}, {}, {}
+    buckets = {'CHM': chm_weights, 'OCM': ocm_weights, 'DREI': drei_weights}
+    cursor.execute("SELECT Category, Name, Weight FROM MetricWeights")
+    for row in cursor.fetchall():
+        if row['Category'] == 'AssetCriticality':
+            criticality_map[row['Name'].upper()] = float(row['Weight'])
+        elif row['Category'] in buckets:
+            buckets[row['Category']][row['Name']] = float(row['Weight'])
+
+    result = (chm_weights, ocm_weights, drei_weights, criticality_map)
+    _store_config('weights', result)
+    return result
+
+
+def load_severity_map(cursor):
+    """Return {severity_id: severity_name} from CommonLookup"""
+    cached = _cached_config('severity')
+    if cached is not None:
+        return cached
+
+    cursor.execute("SELECT Id, Name FROM CommonLookup WHERE Type = 'SeverityLevel'")
+    severity_map = {row['Id']: row['Name'] for row in cursor.fetchall()}
+    _store_config('severity', severity_map)
+    return severity_map
+
+
+def get_incident_frequency(cursor):
+    """Return the global IncidentCreationFrequency from CommonLookup"""
+    cached = _cached_config('incident_frequency')
+    if cached is not None:
+        return cached
+
+    cursor.execute("""
+        SELECT Name FROM CommonLookup WHERE Type = 'IncidentCreationFrequency' LIMIT 1
+    """)
+    freq_row = cursor.fetchone()
+    incident_frequency = int(freq_row['Name']) if freq_row else 3
+    _store_config('incident_frequency', incident_frequency)
+    return incident_frequency
+
+
+# Assets and the per-frequency KPI lists change rarely but were re-queried
+# (with three joins) at the start of every tick. One tick of the fastest
+# job is a safe staleness bound.
+ASSET_KPI_CACHE_TTL = 60  # seconds
+
+
+def load_assets(cursor):
+    """Return all active assets with their ministry/department/impact joins"""
+    cached = _cached_config('assets', ASSET_KPI_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    cursor.execute("""
+        SELECT a.*, m.MinistryName, d.DepartmentName,
+               cl.Name as CitizenImpactLevel
+        FROM Assets a
+        LEFT JOIN Ministries m ON a.MinistryId = m.Id
+        LEFT JOIN Departments d ON a.DepartmentId = d.Id
+        LEFT JOIN CommonLookup cl ON a.CitizenImpactLevelId = cl.Id
+        WHERE a.DeletedAt IS NULL
+    """)
+    assets = cursor.fetchall()
+    _store_config('assets', assets)
+    return assets
+
+
+def load_kpis_for_frequency(cursor, frequency):
+    """Return the automated KPIs scheduled at the given frequency"""
+    key = ('kpis', frequency)
+    cached = _cached_config(key, ASSET_KPI_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    cursor.execute("""
+        SELECT Id, KpiName, KpiGroup, KpiType, Outcome,
+               TargetHigh, TargetMedium, TargetLow, Frequency, SeverityId
+        FROM KpisLov
+        WHERE KpiType IS NOT NULL AND Frequency = %s
+              AND `Manual` = 'Auto' AND DeletedAt IS NULL
+    """, (frequency,))
+    kpis = cursor.fetchall()
+    _store_config(key, kpis)
+    return kpis
+
+
+def load_automated_kpis(cursor):
+    """Return all automated KPIs (Id, KpiName, KpiGroup, Weight) for metrics"""
+    cached = _cached_config('auto_kpis')
+    if cached is not None:
+        return cached
+
+    cursor.execute("""
+        SELECT Id, KpiName, KpiGroup, Weight
+        FROM KpisLov
+        WHERE `Manual` = 'Auto' AND DeletedAt IS NULL AND KpiType IS NOT NULL
+    """)
+    all_kpis = cursor.fetchall()
+    _store_config('auto_kpis', all_kpis)
+    return all_kpis
+
+
 def recalculate_asset_metrics(cursor, asset_id, citizen_impact_level):
     """
     Recalculate all metrics for a single asset based on last 30 days of data.
@@ -569,54 +968,28 @@ def recalculate_asset_metrics(cursor, asset_id, citizen_impact_level):
         # ----------------------------------------------------------
         # 1. Load weight configuration from MetricWeights
         # ----------------------------------------------------------
-        chm_weights = {}
-        cursor.execute("SELECT Name, Weight FROM MetricWeights WHERE Category = 'CHM'")
-        for row in cursor.fetchall():
-            chm_weights[row['Name']] = float(row['Weight'])
-
-        ocm_weights = {}
-        cursor.execute("SELECT Name, Weight FROM MetricWeights WHERE Category = 'OCM'")
-        for row in cursor.fetchall():
-            ocm_weights[row['Name']] = float(row['Weight'])
-
-        drei_weights = {}
-        cursor.execute("SELECT Name, Weight FROM MetricWeights WHERE Category = 'DREI'")
-        for row in cursor.fetchall():
-            drei_weights[row['Name']] = float(row['Weight'])
-
-        criticality_map = {}
-        cursor.execute("SELECT Name, Weight FROM MetricWeights WHERE Category = 'AssetCriticality'")
-        for row in cursor.fetchall():
-            criticality_map[row['Name'].upper()] = float(row['Weight'])
+        chm_weights, ocm_weights, drei_weights, criticality_map = load_metric_weights(cursor)
 
         # ----------------------------------------------------------
         # 2. Calculate KPI Group Indexes (hit rate per KPI, weighted)
         # ----------------------------------------------------------
         # Get all automated KPIs with their group and weight
-        cursor.execute("""
-            SELECT Id, KpiName, KpiGroup, Weight
-            FROM KpisLov
-            WHERE `Manual` = 'Auto' AND DeletedAt IS NULL AND KpiType IS NOT NULL
-        """)
-        all_kpis = cursor.fetchall()
+        all_kpis = load_automated_kpis(cursor)
 
-        # Get last 30 days of results for this asset
+        # Aggregate last 30 days of results per KPI in SQL - only one row
+        # per KPI crosses the wire instead of every history row
         cursor.execute("""
-            SELECT KpiId, Target
+            SELECT KpiId,
+                   SUM(CASE WHEN Target = 'hit' THEN 1 ELSE 0 END) AS hits,
+                   COUNT(*) AS total
             FROM KPIsResultHistories
             WHERE AssetId = %s AND CreatedAt >= %s AND Target IN ('hit', 'miss')
+            GROUP BY KpiId
         """, (asset_id, period_start))
-        history_rows = cursor.fetchall()
-
-        # Calculate hit rate per KPI
-        kpi_stats = {}  # {kpi_id: {'hits': 0, 'total': 0}}
-        for row in history_rows:
-            kpi_id = row['KpiId']
-            if kpi_id not in kpi_stats:
-                kpi_stats[kpi_id] = {'hits': 0, 'total': 0}
-            kpi_stats[kpi_id]['total'] += 1
-            if row['Target'] == 'hit':
-                kpi_stats[kpi_id]['hits'] += 1
+
+        # {kpi_id: {'hits': 0, 'total': 0}}
+        kpi_stats = {row['KpiId']: {'hits': int(row['hits']), 'total': int(row['total'])}
+                     for row in cursor.fetchall()}
 
         # Group KPIs and calculate weighted index per group
         group_indexes = {}
@@ -675,10 +1048,7 @@ def recalculate_asset_metrics(cursor, asset_id, citizen_impact_level):
         # 5. Calculate DREI (Digital Risk Exposure Index)
         # ----------------------------------------------------------
         # Get severity names for mapping
-        severity_map = {}  # {severity_id: severity_name}
-        cursor.execute("SELECT Id, Name FROM CommonLookup WHERE Type = 'SeverityLevel'")
-        for row in cursor.fetchall():
-            severity_map[row['Id']] = row['Name']
+        severity_map = load_severity_map(cursor)  # {severity_id: severity_name}
 
         # Count incidents by severity (all time for this asset)
         cursor.execute("""
@@ -717,13 +1087,11 @@ def recalculate_asset_metrics(cursor, asset_id, citizen_impact_level):
         drei_total_weight = sum(drei_weights.values())
         raw_drei = drei_component / drei_total_weight if drei_total_weight > 0 else 0
 
-        # Apply asset criticality
+        # Apply asset criticality - keys are single words (HIGH/MEDIUM/LOW),
+        # so the first token of the level is a direct dict lookup
         level = (citizen_impact_level or '').upper()
-        asset_criticality_pct = 30  # default Low
-        for crit_level, crit_pct in criticality_map.items():
-            if level.startswith(crit_level):
-                asset_criticality_pct = crit_pct
-                break
+        first_word = level.split(None, 1)[0] if level else ''
+        asset_criticality_pct = criticality_map.get(first_word, 30)  # default Low
 
         drei = raw_drei * (asset_criticality_pct / 100)
 
@@ -770,8 +1138,29 @@ def recalculate_asset_metrics(cursor, asset_id, citizen_impact_level):
 # KPI EXECUTION
 # ============================================================
 
-def run_kpi_for_asset(cursor, asset, kpi, incident_frequency):
-    """Run a single KPI check for a single asset"""
+def resolve_target_key(asset):
+    """Return which KpisLov target column applies to this asset.
+
+    Cached on the asset dict so the CitizenImpactLevel prefix matching
+    runs once per asset instead of once per KPI check."""
+    target_key = asset.get('_target_key')
+    if target_key is None:
+        level = (asset.get('CitizenImpactLevel') or '').upper()
+        if level.startswith('HIGH'):
+            target_key = 'TargetHigh'
+        elif level.startswith('LOW'):
+            target_key = 'TargetLow'
+        else:
+            target_key = 'TargetMedium'
+        asset['_target_key'] = target_key
+    return target_key
+
+def run_kpi_for_asset(cursor, asset, kpi, incident_frequency, history_batch=None, write_cursor=None, recent_targets=None):
+    """Run a single KPI check for a single asset.
+
+    history_batch: optional list for queueing history rows (see
+    store_in_results_history). When batching, the current result is not in
+    the DB yet, so consecutive-hit/miss checks look at one fewer stored row."""
     kpi_type = kpi['KpiType']
     kpi_name = kpi['KpiName']
     outcome_type = kpi['Outcome']
@@ -796,19 +1185,13 @@ def run_kpi_for_asset(cursor, asset, kpi, incident_frequency):
     try:
         result = runner.run()
 
-        # Determine target based on CitizenImpactLevel (prefix matching for CommonLookup values)
-        citizen_impact_level = (asset.get('CitizenImpactLevel') or '').upper()
-        if citizen_impact_level.startswith('HIGH'):
-            target_value = kpi.get('TargetHigh')
-        elif citizen_impact_level.startswith('LOW'):
-            target_value = kpi.get('TargetLow')
-        else:
-            target_value = kpi.get('TargetMedium')
+        # Determine target based on CitizenImpactLevel (resolved once per asset)
+        target_value = kpi.get(resolve_target_key(asset))
 
         # Store result (returns kpisResults row ID for history FK)
-        result_id = store_result(cursor, asset['Id'], kpi['Id'], result, outcome_type, target_value)
-
-        # Determine hit/miss
+        result_value = format_result_value(result, outcome_type)
+        # Determine hit/miss once and hand it to store_result, instead of
+        # letting store_result rerun the same comparison internally
         target = determine_target_hit_miss(
             result.get('value'),
             target_value,
@@ -816,26 +1199,34 @@ def run_kpi_for_asset(cursor, asset, kpi, incident_frequency):
             result.get('flag')
         )
 
+        result_id = store_result(cursor, asset['Id'], kpi['Id'], result, outcome_type, target_override=target, write_cursor=write_cursor, result_value=result_value)
+
         # Store in history
-        result_value = format_result_value(result, outcome_type)
-        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], target, result_value, result.get('details', ''))
+        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], target, result_value, result.get('details', ''), batch=history_batch)
+
+        # When batching, the current result is still pending - it already
+        # counts as one hit/miss, so the DB only needs to supply the rest
+        pending = 1 if history_batch is not None else 0
 
         # Handle incidents using global incidentCreationFrequency
         if target == "miss":
-            should_create = check_consecutive_failures(cursor, asset['Id'], kpi['Id'], incident_frequency)
+            should_create, open_incident_id = check_miss_state(cursor, asset['Id'], kpi['Id'], incident_frequency - pending, recent_targets=recent_targets)
 
             if should_create:
-                severity_id = kpi.get('SeverityId')
-                incident_id, is_new = create_incident(cursor, asset['Id'], kpi['Id'], kpi_name, severity_id)
-                if incident_id and is_new:
-                    log(f"[INCIDENT] #{incident_id} created (after {incident_frequency} consecutive misses)")
-                elif incident_id:
-                    log(f"[EXISTING] Incident #{incident_id} already open")
+                if open_incident_id:
+                    log(f"[EXISTING] Incident #{open_incident_id} already open")
+                else:
+                    severity_id = kpi.get('SeverityId')
+                    incident_id, is_new = create_incident(cursor, asset['Id'], kpi['Id'], kpi_name, severity_id, skip_open_check=True)
+                    if incident_id and is_new:
+                        log(f"[INCIDENT] #{incident_id} created (after {incident_frequency} consecutive misses)")
+                    elif incident_id:
+                        log(f"[EXISTING] Incident #{incident_id} already open")
             else:
                 log(f"[WAIT] Need {incident_frequency} consecutive misses")
         else:
             # Auto-close only after consecutive hits
-            should_close = check_consecutive_hits(cursor, asset['Id'], kpi['Id'], 1)
+            should_close = check_consecutive_hits(cursor, asset['Id'], kpi['Id'], 1 - pending, recent_targets=recent_targets)
             if should_close:
                 auto_close_incident(cursor, asset['Id'], kpi['Id'])
 
@@ -846,15 +1237,15 @@ def run_kpi_for_asset(cursor, asset, kpi, incident_frequency):
 
         # Store error as skipped
         error_result = {'flag': True, 'value': None, 'details': f"Error: {str(e)[:200]}"}
-        result_id = store_result(cursor, asset['Id'], kpi['Id'], error_result, outcome_type, target_override="skipped")
+        result_value = format_result_value(error_result, outcome_type)
+        result_id = store_result(cursor, asset['Id'], kpi['Id'], error_result, outcome_type, target_override="skipped", write_cursor=write_cursor, result_value=result_value)
 
         # Store in history as skipped
-        result_value = format_result_value(error_result, outcome_type)
-        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f"Error: {str(e)[:200]}")
+        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f"Error: {str(e)[:200]}", batch=history_batch)
 
         return "skipped"
 
-def run_browser_kpi_with_page(cursor, asset, kpi, incident_frequency, page, load_time):
+def run_browser_kpi_with_page(cursor, asset, kpi, incident_frequency, page, load_time, history_batch=None, write_cursor=None, recent_targets=None):
     """Run a browser KPI check using a shared page instance"""
     kpi_name = kpi['KpiName']
     outcome_type = kpi['Outcome']
@@ -875,19 +1266,13 @@ def run_browser_kpi_with_page(cursor, asset, kpi, incident_frequency, page, load
         runner = BrowserKPIRunner(asset_data, kpi_data)
         result = runner.run_with_page(page, load_time)
 
-        # Determine target based on CitizenImpactLevel
-        citizen_impact_level = (asset.get('CitizenImpactLevel') or '').upper()
-        if citizen_impact_level.startswith('HIGH'):
-            target_value = kpi.get('TargetHigh')
-        elif citizen_impact_level.startswith('LOW'):
-            target_value = kpi.get('TargetLow')
-        else:
-            target_value = kpi.get('TargetMedium')
+        # Determine target based on CitizenImpactLevel (resolved once per asset)
+        target_value = kpi.get(resolve_target_key(asset))
 
         # Store result
-        result_id = store_result(cursor, asset['Id'], kpi['Id'], result, outcome_type, target_value)
-
-        # Determine hit/miss
+        result_value = format_result_value(result, outcome_type)
+        # Determine hit/miss once and hand it to store_result, instead of
+        # letting store_result rerun the same comparison internally
         target = determine_target_hit_miss(
             result.get('value'),
             target_value,
@@ -895,24 +1280,31 @@ def run_browser_kpi_with_page(cursor, asset, kpi, incident_frequency, page, load
             result.get('flag')
         )
 
+        result_id = store_result(cursor, asset['Id'], kpi['Id'], result, outcome_type, target_override=target, write_cursor=write_cursor, result_value=result_value)
+
         # Store in history
-        result_value = format_result_value(result, outcome_type)
-        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], target, result_value, result.get('details', ''))
+        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], target, result_value, result.get('details', ''), batch=history_batch)
+
+        # When batching, the current result is still pending (see run_kpi_for_asset)
+        pending = 1 if history_batch is not None else 0
 
         # Handle incidents
         if target == "miss":
-            should_create = check_consecutive_failures(cursor, asset['Id'], kpi['Id'], incident_frequency)
+            should_create, open_incident_id = check_miss_state(cursor, asset['Id'], kpi['Id'], incident_frequency - pending, recent_targets=recent_targets)
             if should_create:
-                severity_id = kpi.get('SeverityId')
-                incident_id, is_new = create_incident(cursor, asset['Id'], kpi['Id'], kpi_name, severity_id)
-                if incident_id and is_new:
-                    log(f"[INCIDENT] #{incident_id} created (after {incident_frequency} consecutive misses)")
-                elif incident_id:
-                    log(f"[EXISTING] Incident #{incident_id} already open")
+                if open_incident_id:
+                    log(f"[EXISTING] Incident #{open_incident_id} already open")
+                else:
+                    severity_id = kpi.get('SeverityId')
+                    incident_id, is_new = create_incident(cursor, asset['Id'], kpi['Id'], kpi_name, severity_id, skip_open_check=True)
+                    if incident_id and is_new:
+                        log(f"[INCIDENT] #{incident_id} created (after {incident_frequency} consecutive misses)")
+                    elif incident_id:
+                        log(f"[EXISTING] Incident #{incident_id} already open")
             else:
                 log(f"[WAIT] Need {incident_frequency} consecutive misses")
         else:
-            should_close = check_consecutive_hits(cursor, asset['Id'], kpi['Id'], 1)
+            should_close = check_consecutive_hits(cursor, asset['Id'], kpi['Id'], 1 - pending, recent_targets=recent_targets)
             if should_close:
                 auto_close_incident(cursor, asset['Id'], kpi['Id'])
 
@@ -921,9 +1313,9 @@ def run_browser_kpi_with_page(cursor, asset, kpi, incident_frequency, page, load
     except Exception as e:
         log(f"[ERROR] {str(e)}", "error")
         error_result = {'flag': True, 'value': None, 'details': f"Error: {str(e)[:200]}"}
-        result_id = store_result(cursor, asset['Id'], kpi['Id'], error_result, outcome_type, target_override="skipped")
         result_value = format_result_value(error_result, outcome_type)
-        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f"Error: {str(e)[:200]}")
+        result_id = store_result(cursor, asset['Id'], kpi['Id'], error_result, outcome_type, target_override="skipped", write_cursor=write_cursor, result_value=result_value)
+        store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f"Error: {str(e)[:200]}", batch=history_batch)
         return "skipped"
 
 
@@ -932,29 +1324,33 @@ def process_single_asset_1min(asset, kpis, incident_freq):
     No pre-check needed - KPI 1 (completely down) IS the down check.
     If KPI 1 returns miss, remaining KPIs are skipped."""
     counts = {'checks': 0, 'hits': 0, 'misses': 0, 'skipped': 0}
+    if SHUTDOWN.is_set():
+        counts['log_buffer'] = []
+        return counts
     _thread_local.log_buffer = []
     conn = get_thread_db_connection()
     cursor = conn.cursor(dictionary=True)
+    write_cursor = get_thread_write_cursor()
+    history_batch = []
+    recent_targets = load_recent_targets(cursor, asset['Id'], incident_freq)
 
     try:
         log(f"Asset: {asset['AssetName']} ({asset['CitizenImpactLevel'] or 'N/A'}) | URL: {asset['AssetUrl']}")
         site_is_down = False
 
         for kpi in kpis:
-            kpi_name_lower = kpi['KpiName'].lower()
-
             if site_is_down:
                 counts['checks'] += 1
                 counts['skipped'] += 1
                 skipped_result = {'flag': True, 'value': None, 'details': 'Skipped - site is down'}
-                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped")
+                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped", write_cursor=write_cursor)
                 result_value = format_result_value(skipped_result, kpi['Outcome'])
-                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down')
+                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down', batch=history_batch)
                 log(f"  [SKIP] {kpi['KpiName']} (site is down)")
                 continue
 
             counts['checks'] += 1
-            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq)
+            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq, history_batch=history_batch, write_cursor=write_cursor, recent_targets=recent_targets)
 
             if result == "hit":
                 counts['hits'] += 1
@@ -970,14 +1366,16 @@ def process_single_asset_1min(asset, kpis, incident_freq):
 
             log(f"  {symbol} {kpi['KpiName']}")
 
-            if 'completely down' in kpi_name_lower and result == "miss":
-                if check_consecutive_failures(cursor, asset['Id'], kpi['Id'], 2):
+            if kpi.get('is_gating') and result == "miss":
+                # Current miss is still in the pending batch, so 1 prior stored miss = 2 consecutive
+                if check_consecutive_failures(cursor, asset['Id'], kpi['Id'], 1, recent_targets=recent_targets):
                     site_is_down = True
                     log(f"  >> Site is DOWN (2 consecutive failures) - skipping remaining KPIs")
 
-        conn.commit()
+        flush_history_batch(cursor, history_batch)
         recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
         conn.commit()
+        publish_result_cache()
         notify_control_panel(asset['Id'])
         notify_dashboards()
 
@@ -985,8 +1383,12 @@ def process_single_asset_1min(asset, kpis, incident_freq):
         log(f"[ERROR] Asset {asset['AssetName']}: {str(e)}", "error")
         try:
             conn.commit()
+            publish_result_cache()
         except:
-            pass
+            # Commit failed: the staged entries were never made durable, and
+            # if this connection survives, the next asset on this thread
+            # would otherwise publish them with its own commit.
+            discard_result_cache()
     finally:
         cursor.close()
 
@@ -1006,38 +1408,27 @@ def run_1min_kpis():
     log("=" * 80)
 
     try:
-        cursor.execute("""
-            SELECT Name FROM CommonLookup WHERE Type = 'IncidentCreationFrequency' LIMIT 1
-        """)
-        freq_row = cursor.fetchone()
-        incident_frequency = int(freq_row['Name']) if freq_row else 3
+        incident_frequency = get_incident_frequency(cursor)
 
-        cursor.execute("""
-            SELECT a.*, m.MinistryName, d.DepartmentName,
-                   cl.Name as CitizenImpactLevel
-            FROM Assets a
-            LEFT JOIN Ministries m ON a.MinistryId = m.Id
-            LEFT JOIN Departments d ON a.DepartmentId = d.Id
-            LEFT JOIN CommonLookup cl ON a.CitizenImpactLevelId = cl.Id
-            WHERE a.DeletedAt IS NULL
-        """)
-        assets = cursor.fetchall()
+        assets = load_assets(cursor)
 
-        cursor.execute("""
-            SELECT Id, KpiName, KpiGroup, KpiType, Outcome,
-                   TargetHigh, TargetMedium, TargetLow, Frequency, SeverityId
-            FROM KpisLov
-            WHERE KpiType IS NOT NULL AND Frequency = '1 min'
-                  AND `Manual` = 'Auto' AND DeletedAt IS NULL
-        """)
-        kpis = cursor.fetchall()
+        kpis = load_kpis_for_frequency(cursor, '1 min')
 
         if not kpis:
             log("No KPIs found with frequency: 1 min", "warning")
             return
 
+        # Tag the gating "completely down" KPI once and sort it to the
+        # front - workers then flag it with a dict lookup instead of a
+        # substring scan per KPI, and a down site short-circuits the rest
+        # of the list on the very first check
+        for kpi in kpis:
+            kpi['is_gating'] = 'completely down' in kpi['KpiName'].lower()
+        kpis.sort(key=lambda k: not k['is_gating'])
+
         log(f"Assets: {len(assets)} | KPIs: {len(kpis)} | Workers: {PARALLEL_WORKERS}")
 
+        prewarm_dns_for_tick(assets, kpis)
         totals = run_parallel_and_log_in_order(assets, process_single_asset_1min, (kpis, incident_frequency))
 
         log(f"Summary: {totals['checks']} checks | {totals['hits']} hits | {totals['misses']} misses | {totals['skipped']} skipped")
@@ -1053,9 +1444,15 @@ def process_single_asset_5min(asset, kpis, incident_freq):
     """Process all 5-min KPIs for a single asset in a worker thread.
     Uses pre-check since 5-min KPIs don't include KPI 1 (completely down)."""
     counts = {'checks': 0, 'hits': 0, 'misses': 0, 'skipped': 0}
+    if SHUTDOWN.is_set():
+        counts['log_buffer'] = []
+        return counts
     _thread_local.log_buffer = []
     conn = get_thread_db_connection()
     cursor = conn.cursor(dictionary=True)
+    write_cursor = get_thread_write_cursor()
+    history_batch = []
+    recent_targets = load_recent_targets(cursor, asset['Id'], incident_freq)
 
     try:
         log(f"Asset: {asset['AssetName']} ({asset['CitizenImpactLevel'] or 'N/A'}) | URL: {asset['AssetUrl']}")
@@ -1083,13 +1480,14 @@ def process_single_asset_5min(asset, kpis, incident_freq):
                 counts['checks'] += 1
                 counts['skipped'] += 1
                 skipped_result = {'flag': True, 'value': None, 'details': 'Skipped - site is down (pre-check failed)'}
-                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped")
+                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped", write_cursor=write_cursor)
                 result_value = format_result_value(skipped_result, kpi['Outcome'])
-                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down (pre-check failed)')
+                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down (pre-check failed)', batch=history_batch)
                 log(f"  [SKIP] {kpi['KpiName']} (site is down)")
-            conn.commit()
+            flush_history_batch(cursor, history_batch)
             recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
             conn.commit()
+            publish_result_cache()
             notify_control_panel(asset['Id'])
             notify_dashboards()
             counts['log_buffer'] = _thread_local.log_buffer
@@ -1099,7 +1497,7 @@ def process_single_asset_5min(asset, kpis, incident_freq):
 
         for kpi in kpis:
             counts['checks'] += 1
-            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq)
+            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq, history_batch=history_batch, write_cursor=write_cursor, recent_targets=recent_targets)
 
             if result == "hit":
                 counts['hits'] += 1
@@ -1115,9 +1513,10 @@ def process_single_asset_5min(asset, kpis, incident_freq):
 
             log(f"  {symbol} {kpi['KpiName']}")
 
-        conn.commit()
+        flush_history_batch(cursor, history_batch)
         recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
         conn.commit()
+        publish_result_cache()
         notify_control_panel(asset['Id'])
         notify_dashboards()
 
@@ -1125,8 +1524,12 @@ def process_single_asset_5min(asset, kpis, incident_freq):
         log(f"[ERROR] Asset {asset['AssetName']}: {str(e)}", "error")
         try:
             conn.commit()
+            publish_result_cache()
         except:
-            pass
+            # Commit failed: the staged entries were never made durable, and
+            # if this connection survives, the next asset on this thread
+            # would otherwise publish them with its own commit.
+            discard_result_cache()
     finally:
         cursor.close()
 
@@ -1146,31 +1549,11 @@ def run_5min_kpis():
     log("=" * 80)
 
     try:
-        cursor.execute("""
-            SELECT Name FROM CommonLookup WHERE Type = 'IncidentCreationFrequency' LIMIT 1
-        """)
-        freq_row = cursor.fetchone()
-        incident_frequency = int(freq_row['Name']) if freq_row else 3
+        incident_frequency = get_incident_frequency(cursor)
 
-        cursor.execute("""
-            SELECT a.*, m.MinistryName, d.DepartmentName,
-                   cl.Name as CitizenImpactLevel
-            FROM Assets a
-            LEFT JOIN Ministries m ON a.MinistryId = m.Id
-            LEFT JOIN Departments d ON a.DepartmentId = d.Id
-            LEFT JOIN CommonLookup cl ON a.CitizenImpactLevelId = cl.Id
-            WHERE a.DeletedAt IS NULL
-        """)
-        assets = cursor.fetchall()
+        assets = load_assets(cursor)
 
-        cursor.execute("""
-            SELECT Id, KpiName, KpiGroup, KpiType, Outcome,
-                   TargetHigh, TargetMedium, TargetLow, Frequency, SeverityId
-            FROM KpisLov
-            WHERE KpiType IS NOT NULL AND Frequency = '5 min'
-                  AND `Manual` = 'Auto' AND DeletedAt IS NULL
-        """)
-        kpis = cursor.fetchall()
+        kpis = load_kpis_for_frequency(cursor, '5 min')
 
         if not kpis:
             log("No KPIs found with frequency: 5 min", "warning")
@@ -1178,6 +1561,7 @@ def run_5min_kpis():
 
         log(f"Assets: {len(assets)} | KPIs: {len(kpis)} | Workers: {PARALLEL_WORKERS}")
 
+        prewarm_dns_for_tick(assets, kpis)
         totals = run_parallel_and_log_in_order(assets, process_single_asset_5min, (kpis, incident_frequency))
 
         log(f"Summary: {totals['checks']} checks | {totals['hits']} hits | {totals['misses']} misses | {totals['skipped']} skipped")
@@ -1194,9 +1578,15 @@ def process_single_asset_15min(asset, non_browser_kpis, browser_kpis, incident_f
     Uses pre-check to skip down sites. Runs non-browser KPIs first,
     then browser KPIs with SharedBrowserContext."""
     counts = {'checks': 0, 'hits': 0, 'misses': 0, 'skipped': 0}
+    if SHUTDOWN.is_set():
+        counts['log_buffer'] = []
+        return counts
     _thread_local.log_buffer = []
     conn = get_thread_db_connection()
     cursor = conn.cursor(dictionary=True)
+    write_cursor = get_thread_write_cursor()
+    history_batch = []
+    recent_targets = load_recent_targets(cursor, asset['Id'], incident_freq)
 
     try:
         log(f"Asset: {asset['AssetName']} ({asset['CitizenImpactLevel'] or 'N/A'}) | URL: {asset['AssetUrl']}")
@@ -1225,13 +1615,14 @@ def process_single_asset_15min(asset, non_browser_kpis, browser_kpis, incident_f
                 counts['checks'] += 1
                 counts['skipped'] += 1
                 skipped_result = {'flag': True, 'value': None, 'details': 'Skipped - site is down (pre-check failed)'}
-                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped")
+                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped", write_cursor=write_cursor)
                 result_value = format_result_value(skipped_result, kpi['Outcome'])
-                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down (pre-check failed)')
+                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down (pre-check failed)', batch=history_batch)
                 log(f"  [SKIP] {kpi['KpiName']} (site is down)")
-            conn.commit()
+            flush_history_batch(cursor, history_batch)
             recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
             conn.commit()
+            publish_result_cache()
             notify_control_panel(asset['Id'])
             notify_dashboards()
             counts['log_buffer'] = _thread_local.log_buffer
@@ -1242,7 +1633,7 @@ def process_single_asset_15min(asset, non_browser_kpis, browser_kpis, incident_f
         # Run non-browser KPIs first
         for kpi in non_browser_kpis:
             counts['checks'] += 1
-            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq)
+            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq, history_batch=history_batch, write_cursor=write_cursor, recent_targets=recent_targets)
 
             if result == "hit":
                 counts['hits'] += 1
@@ -1269,7 +1660,7 @@ def process_single_asset_15min(asset, non_browser_kpis, browser_kpis, incident_f
 
                     for kpi in browser_kpis:
                         counts['checks'] += 1
-                        result = run_browser_kpi_with_page(cursor, asset, kpi, incident_freq, page, load_time)
+                        result = run_browser_kpi_with_page(cursor, asset, kpi, incident_freq, page, load_time, history_batch=history_batch, write_cursor=write_cursor, recent_targets=recent_targets)
 
                         if result == "hit":
                             counts['hits'] += 1
@@ -1291,14 +1682,15 @@ def process_single_asset_15min(asset, non_browser_kpis, browser_kpis, incident_f
                     counts['checks'] += 1
                     counts['skipped'] += 1
                     skipped_result = {'flag': True, 'value': None, 'details': f'Browser error: {str(e)[:100]}'}
-                    result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped")
+                    result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped", write_cursor=write_cursor)
                     result_value = format_result_value(skipped_result, kpi['Outcome'])
-                    store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f'Browser error: {str(e)[:100]}')
+                    store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f'Browser error: {str(e)[:100]}', batch=history_batch)
                     log(f"  [SKIP] {kpi['KpiName']} (browser error)")
 
-        conn.commit()
+        flush_history_batch(cursor, history_batch)
         recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
         conn.commit()
+        publish_result_cache()
         notify_control_panel(asset['Id'])
         notify_dashboards()
 
@@ -1306,8 +1698,12 @@ def process_single_asset_15min(asset, non_browser_kpis, browser_kpis, incident_f
         log(f"[ERROR] Asset {asset['AssetName']}: {str(e)}", "error")
         try:
             conn.commit()
+            publish_result_cache()
         except:
-            pass
+            # Commit failed: the staged entries were never made durable, and
+            # if this connection survives, the next asset on this thread
+            # would otherwise publish them with its own commit.
+            discard_result_cache()
     finally:
         cursor.close()
 
@@ -1327,31 +1723,11 @@ def run_15min_kpis():
     log("=" * 80)
 
     try:
-        cursor.execute("""
-            SELECT Name FROM CommonLookup WHERE Type = 'IncidentCreationFrequency' LIMIT 1
-        """)
-        freq_row = cursor.fetchone()
-        incident_frequency = int(freq_row['Name']) if freq_row else 3
+        incident_frequency = get_incident_frequency(cursor)
 
-        cursor.execute("""
-            SELECT a.*, m.MinistryName, d.DepartmentName,
-                   cl.Name as CitizenImpactLevel
-            FROM Assets a
-            LEFT JOIN Ministries m ON a.MinistryId = m.Id
-            LEFT JOIN Departments d ON a.DepartmentId = d.Id
-            LEFT JOIN CommonLookup cl ON a.CitizenImpactLevelId = cl.Id
-            WHERE a.DeletedAt IS NULL
-        """)
-        assets = cursor.fetchall()
+        assets = load_assets(cursor)
 
-        cursor.execute("""
-            SELECT Id, KpiName, KpiGroup, KpiType, Outcome,
-                   TargetHigh, TargetMedium, TargetLow, Frequency, SeverityId
-            FROM KpisLov
-            WHERE KpiType IS NOT NULL AND Frequency = '15 min'
-                  AND `Manual` = 'Auto' AND DeletedAt IS NULL
-        """)
-        kpis = cursor.fetchall()
+        kpis = load_kpis_for_frequency(cursor, '15 min')
 
         if not kpis:
             log("No KPIs found with frequency: 15 min", "warning")
@@ -1362,6 +1738,7 @@ def run_15min_kpis():
 
         log(f"Assets: {len(assets)} | KPIs: {len(kpis)} (browser: {len(browser_kpis)}, other: {len(non_browser_kpis)}) | Workers: {PARALLEL_WORKERS}")
 
+        prewarm_dns_for_tick(assets, kpis)
         totals = run_parallel_and_log_in_order(assets, process_single_asset_15min, (non_browser_kpis, browser_kpis, incident_frequency))
 
         log(f"Summary: {totals['checks']} checks | {totals['hits']} hits | {totals['misses']} misses | {totals['skipped']} skipped")
@@ -1384,33 +1761,13 @@ def run_kpis_by_frequency(frequency_filter):
 
     try:
         # Get global IncidentCreationFrequency from CommonLookup
-        cursor.execute("""
-            SELECT Name FROM CommonLookup WHERE Type = 'IncidentCreationFrequency' LIMIT 1
-        """)
-        freq_row = cursor.fetchone()
-        incident_frequency = int(freq_row['Name']) if freq_row else 3
+        incident_frequency = get_incident_frequency(cursor)
 
         # Get all active assets
-        cursor.execute("""
-            SELECT a.*, m.MinistryName, d.DepartmentName,
-                   cl.Name as CitizenImpactLevel
-            FROM Assets a
-            LEFT JOIN Ministries m ON a.MinistryId = m.Id
-            LEFT JOIN Departments d ON a.DepartmentId = d.Id
-            LEFT JOIN CommonLookup cl ON a.CitizenImpactLevelId = cl.Id
-            WHERE a.DeletedAt IS NULL
-        """)
-        assets = cursor.fetchall()
+        assets = load_assets(cursor)
 
         # Get KPIs matching the frequency (only automated, include SeverityId)
-        cursor.execute("""
-            SELECT Id, KpiName, KpiGroup, KpiType, Outcome,
-                   TargetHigh, TargetMedium, TargetLow, Frequency, SeverityId
-            FROM KpisLov
-            WHERE KpiType IS NOT NULL AND Frequency = %s
-                  AND `Manual` = 'Auto' AND DeletedAt IS NULL
-        """, (frequency_filter,))
-        kpis = cursor.fetchall()
+        kpis = load_kpis_for_frequency(cursor, frequency_filter)
 
         if not kpis:
             log(f"No KPIs found with frequency: {frequency_filter}", "warning")
@@ -1422,12 +1779,18 @@ def run_kpis_by_frequency(frequency_filter):
 
         log(f"Assets: {len(assets)} | KPIs: {len(kpis)} (browser: {len(browser_kpis)}, other: {len(non_browser_kpis)})")
 
+        prewarm_dns_for_tick(assets, kpis)
+
         total_checks = 0
         total_hits = 0
         total_misses = 0
         total_skipped = 0
 
         for asset in assets:
+            if SHUTDOWN.is_set():
+                log("Shutdown requested - stopping before remaining assets", "warning")
+                break
+
             log(f"Asset: {asset['AssetName']} ({asset['CitizenImpactLevel'] or 'N/A'}) | URL: {asset['AssetUrl']}")
 
             # Pre-check: is the site reachable? (HEAD first, GET fallback)
@@ -1467,9 +1830,9 @@ def run_kpis_by_frequency(frequency_filter):
                         result_value = format_result_value(skipped_result, kpi['Outcome'])
                         store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down (pre-check failed)')
                         log(f"  [SKIP] {kpi['KpiName']} (site is down)")
-                conn.commit()
                 recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
                 conn.commit()
+                publish_result_cache()
                 notify_control_panel(asset['Id'])
                 notify_dashboards()
                 continue
@@ -1547,11 +1910,11 @@ def run_kpis_by_frequency(frequency_filter):
                     store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down')
                     log(f"  [SKIP] {kpi['KpiName']} (site is down)")
 
-            conn.commit()
-
-            # Recalculate metrics for this asset after all KPIs are done
+            # Recalculate metrics for this asset after all KPIs are done,
+            # then commit results + metrics together - one fsync per asset
             recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
             conn.commit()
+            publish_result_cache()
             notify_control_panel(asset['Id'])
             notify_dashboards()
 
@@ -1572,18 +1935,44 @@ _thread_local = threading.local()
 
 def get_thread_db_connection():
     """Get a database connection for the current thread"""
-    if not hasattr(_thread_local, 'connection') or not _thread_local.connection.is_connected():
-        _thread_local.connection = mysql.connector.connect(**DB_CONFIG)
+    conn = getattr(_thread_local, 'connection', None)
+    if conn is None or not conn.is_connected():
+        if conn is not None:
+            # The old connection died mid-transaction; anything staged for
+            # the duplicate-suppression cache was never committed.
+            discard_result_cache()
+        _thread_local.connection = get_db_connection()
     return _thread_local.connection
 
+def get_thread_write_cursor():
+    """Get a prepared cursor for the current thread, reserved for the
+    kpisResults UPSERT.
+
+    A prepared cursor re-prepares whenever its statement text changes, so
+    this one must only ever see RESULT_UPSERT_SQL - the server then parses
+    it once per thread and every later execute ships only parameters. It is
+    bound to the thread's connection, so it shares transactions with the
+    thread's regular cursor."""
+    conn = get_thread_db_connection()
+    if getattr(_thread_local, 'write_cursor_conn', None) is not conn:
+        _thread_local.write_cursor = conn.cursor(prepared=True)
+        _thread_local.write_cursor_conn = conn
+    return _thread_local.write_cursor
+
 def process_single_asset_daily(asset, non_browser_kpis, browser_kpis, incident_freq):
     """Process all daily KPIs for a single asset in a worker thread.
     Uses pre-check to skip down sites. Runs non-browser KPIs first,
     then browser KPIs with SharedBrowserContext."""
     counts = {'checks': 0, 'hits': 0, 'misses': 0, 'skipped': 0}
+    if SHUTDOWN.is_set():
+        counts['log_buffer'] = []
+        return counts
     _thread_local.log_buffer = []
     conn = get_thread_db_connection()
     cursor = conn.cursor(dictionary=True)
+    write_cursor = get_thread_write_cursor()
+    history_batch = []
+    recent_targets = load_recent_targets(cursor, asset['Id'], incident_freq)
 
     try:
         log(f"Asset: {asset['AssetName']} ({asset['CitizenImpactLevel'] or 'N/A'}) | URL: {asset['AssetUrl']}")
@@ -1612,13 +2001,14 @@ def process_single_asset_daily(asset, non_browser_kpis, browser_kpis, incident_f
                 counts['checks'] += 1
                 counts['skipped'] += 1
                 skipped_result = {'flag': True, 'value': None, 'details': 'Skipped - site is down (pre-check failed)'}
-                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped")
+                result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped", write_cursor=write_cursor)
                 result_value = format_result_value(skipped_result, kpi['Outcome'])
-                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down (pre-check failed)')
+                store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, 'Skipped - site is down (pre-check failed)', batch=history_batch)
                 log(f"  [SKIP] {kpi['KpiName']} (site is down)")
-            conn.commit()
+            flush_history_batch(cursor, history_batch)
             recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
             conn.commit()
+            publish_result_cache()
             notify_control_panel(asset['Id'])
             notify_dashboards()
             counts['log_buffer'] = _thread_local.log_buffer
@@ -1629,7 +2019,7 @@ def process_single_asset_daily(asset, non_browser_kpis, browser_kpis, incident_f
         # Run non-browser KPIs first
         for kpi in non_browser_kpis:
             counts['checks'] += 1
-            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq)
+            result = run_kpi_for_asset(cursor, asset, kpi, incident_freq, history_batch=history_batch, write_cursor=write_cursor, recent_targets=recent_targets)
 
             if result == "hit":
                 counts['hits'] += 1
@@ -1656,7 +2046,7 @@ def process_single_asset_daily(asset, non_browser_kpis, browser_kpis, incident_f
 
                     for kpi in browser_kpis:
                         counts['checks'] += 1
-                        result = run_browser_kpi_with_page(cursor, asset, kpi, incident_freq, page, load_time)
+                        result = run_browser_kpi_with_page(cursor, asset, kpi, incident_freq, page, load_time, history_batch=history_batch, write_cursor=write_cursor, recent_targets=recent_targets)
 
                         if result == "hit":
                             counts['hits'] += 1
@@ -1678,14 +2068,15 @@ def process_single_asset_daily(asset, non_browser_kpis, browser_kpis, incident_f
                     counts['checks'] += 1
                     counts['skipped'] += 1
                     skipped_result = {'flag': True, 'value': None, 'details': f'Browser error: {str(e)[:100]}'}
-                    result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped")
+                    result_id = store_result(cursor, asset['Id'], kpi['Id'], skipped_result, kpi['Outcome'], target_override="skipped", write_cursor=write_cursor)
                     result_value = format_result_value(skipped_result, kpi['Outcome'])
-                    store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f'Browser error: {str(e)[:100]}')
+                    store_in_results_history(cursor, asset['Id'], result_id, kpi['Id'], "skipped", result_value, f'Browser error: {str(e)[:100]}', batch=history_batch)
                     log(f"  [SKIP] {kpi['KpiName']} (browser error)")
 
-        conn.commit()
+        flush_history_batch(cursor, history_batch)
         recalculate_asset_metrics(cursor, asset['Id'], asset.get('CitizenImpactLevel'))
         conn.commit()
+        publish_result_cache()
         notify_control_panel(asset['Id'])
         notify_dashboards()
 
@@ -1693,8 +2084,12 @@ def process_single_asset_daily(asset, non_browser_kpis, browser_kpis, incident_f
         log(f"[ERROR] Asset {asset['AssetName']}: {str(e)}", "error")
         try:
             conn.commit()
+            publish_result_cache()
         except:
-            pass
+            # Commit failed: the staged entries were never made durable, and
+            # if this connection survives, the next asset on this thread
+            # would otherwise publish them with its own commit.
+            discard_result_cache()
     finally:
         cursor.close()
 
@@ -1714,31 +2109,11 @@ def run_daily_kpis_parallel():
     log("=" * 80)
 
     try:
-        cursor.execute("""
-            SELECT Name FROM CommonLookup WHERE Type = 'IncidentCreationFrequency' LIMIT 1
-        """)
-        freq_row = cursor.fetchone()
-        incident_frequency = int(freq_row['Name']) if freq_row else 3
+        incident_frequency = get_incident_frequency(cursor)
 
-        cursor.execute("""
-            SELECT a.*, m.MinistryName, d.DepartmentName,
-                   cl.Name as CitizenImpactLevel
-            FROM Assets a
-            LEFT JOIN Ministries m ON a.MinistryId = m.Id
-            LEFT JOIN Departments d ON a.DepartmentId = d.Id
-            LEFT JOIN CommonLookup cl ON a.CitizenImpactLevelId = cl.Id
-            WHERE a.DeletedAt IS NULL
-        """)
-        assets = cursor.fetchall()
+        assets = load_assets(cursor)
 
-        cursor.execute("""
-            SELECT Id, KpiName, KpiGroup, KpiType, Outcome,
-                   TargetHigh, TargetMedium, TargetLow, Frequency, SeverityId
-            FROM KpisLov
-            WHERE KpiType IS NOT NULL AND Frequency = 'Daily'
-                  AND `Manual` = 'Auto' AND DeletedAt IS NULL
-        """)
-        kpis = cursor.fetchall()
+        kpis = load_kpis_for_frequency(cursor, 'Daily')
 
         if not kpis:
             log("No daily KPIs found", "warning")
@@ -1749,6 +2124,7 @@ def run_daily_kpis_parallel():
 
         log(f"Assets: {len(assets)} | KPIs: {len(kpis)} (browser: {len(browser_kpis)}, other: {len(non_browser_kpis)}) | Workers: {PARALLEL_WORKERS}")
 
+        prewarm_dns_for_tick(assets, kpis)
         totals = run_parallel_and_log_in_order(assets, process_single_asset_daily, (non_browser_kpis, browser_kpis, incident_frequency))
 
         log(f"Summary: {totals['checks']} checks | {totals['hits']} hits | {totals['misses']} misses | {totals['skipped']} skipped")
@@ -1760,26 +2136,6 @@ def run_daily_kpis_parallel():
         conn.close()
 
 
-# ============================================================
-# SCHEDULER JOBS
-# ============================================================
-
-def job_1_minute():
-    """Job for 1-minute frequency KPIs"""
-    run_1min_kpis()
-
-def job_5_minute():
-    """Job for 5-minute frequency KPIs"""
-    run_5min_kpis()
-
-def job_15_minute():
-    """Job for 15-minute frequency KPIs"""
-    run_15min_kpis()
-
-def job_daily():
-    """Job for daily frequency KPIs - uses parallel processing"""
-    run_daily_kpis_parallel()
-
 # ============================================================
 # MAIN
 # ============================================================
@@ -1821,13 +2177,25 @@ def get_running_pid():
             pid = int(f.read().strip())
         # Check if process is actually running
         if sys.platform == 'win32':
-            # Windows: use tasklist
-            result = subprocess.run(['tasklist', '/FI', f'PID eq {pid}'], capture_output=True, text=True)
-            if str(pid) in result.stdout:
+            # Windows: OpenProcess beats spawning tasklist (~ms vs tens of ms),
+            # and stop_scheduler polls this in a loop
+            import ctypes
+            PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+            handle = ctypes.windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+            if handle:
+                ctypes.windll.kernel32.CloseHandle(handle)
                 return pid
         else:
             # Unix: send signal 0 to check if process exists
             os.kill(pid, 0)
+            # Guard against PID reuse - make sure it's really the scheduler
+            try:
+                with open(f'/proc/{pid}/cmdline', 'rb') as cmdline_file:
+                    cmdline = cmdline_file.read().decode('utf-8', 'replace')
+                if 'scheduler_v3' not in cmdline:
+                    raise ProcessLookupError
+            except FileNotFoundError:
+                pass  # no /proc (e.g. macOS) - fall back to the kill(0) check
             return pid
     except (ValueError, ProcessLookupError, OSError):
         # PID file exists but process is not running
@@ -1841,6 +2209,7 @@ def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     global _scheduler
     log(f"Received signal {signum}, shutting down...")
+    SHUTDOWN.set()  # workers finish their current asset and stop
 
     if _scheduler:
         log("Waiting for current job to complete...")
@@ -1870,7 +2239,14 @@ def start_scheduler():
         signal.signal(signal.SIGHUP, signal_handler)
 
     global _scheduler
-    _scheduler = BlockingScheduler()
+    # Thread-pool executor lets different frequency jobs run concurrently
+    # when they fire at the same minute (each job still has max_instances=1,
+    # so a frequency never overlaps itself). KPI work is network-bound, so
+    # threads are the right fit here.
+    _scheduler = BlockingScheduler(
+        executors={'default': APSThreadPoolExecutor(4)},
+        job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 60},
+    )
 
     log("=" * 80)
     log("KPI MONITORING SCHEDULER v3 - STARTED")
@@ -1886,18 +2262,18 @@ def start_scheduler():
     # Schedule jobs with coalesce=True to merge missed runs, and misfire_grace_time
     # coalesce=True: If job was missed multiple times, run only once
     # misfire_grace_time: How many seconds late a job can be and still run
-    _scheduler.add_job(job_1_minute, IntervalTrigger(minutes=3), id='kpi_1min', name='1-minute KPIs',
+    _scheduler.add_job(run_1min_kpis, IntervalTrigger(minutes=3), id='kpi_1min', name='1-minute KPIs',
                        coalesce=True, max_instances=1, misfire_grace_time=60)
-    _scheduler.add_job(job_5_minute, IntervalTrigger(minutes=10), id='kpi_5min', name='5-minute KPIs',
+    _scheduler.add_job(run_5min_kpis, IntervalTrigger(minutes=10), id='kpi_5min', name='5-minute KPIs',
                        coalesce=True, max_instances=1, misfire_grace_time=120)
-    _scheduler.add_job(job_15_minute, IntervalTrigger(minutes=20), id='kpi_15min', name='15-minute KPIs',
+    _scheduler.add_job(run_15min_kpis, IntervalTrigger(minutes=20), id='kpi_15min', name='15-minute KPIs',
                        coalesce=True, max_instances=1, misfire_grace_time=180)
-    _scheduler.add_job(job_daily, CronTrigger(hour=DAILY_RUN_HOUR, minute=DAILY_RUN_MINUTE), id='kpi_daily', name='Daily KPIs',
+    _scheduler.add_job(run_daily_kpis_parallel, CronTrigger(hour=DAILY_RUN_HOUR, minute=DAILY_RUN_MINUTE), id='kpi_daily', name='Daily KPIs',
                        coalesce=True, max_instances=1, misfire_grace_time=300)
 
     # Run 1-minute KPIs immediately on startup
     log("Running initial checks...")
-    job_1_minute()
+    run_1min_kpis()
 
     try:
         _scheduler.start()
@@ -1924,9 +2300,16 @@ def stop_scheduler():
             # Unix: send SIGTERM
             os.kill(pid, signal.SIGTERM)
 
-        # Wait a moment and verify it stopped
-        import time
-        time.sleep(2)
+        # Poll with backoff instead of a blind 2s sleep - returns as soon
+        # as the process is gone, and gives a slow shutdown up to 10s of
+        # grace before escalating to SIGKILL
+        deadline = time.monotonic() + 10
+        delay = 0.05
+        while time.monotonic() < deadline:
+            if not get_running_pid():
+                break
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.5)
 
         if get_running_pid():
             log("Scheduler did not stop gracefully, forcing...", "warning")